@@ -0,0 +1,21 @@
+import os
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+import logging
+from modules.scheduler import run_scheduler
+import warnings
+
+warnings.simplefilter(action="ignore", category=FutureWarning)
+
+logging.basicConfig(
+    filename="stock-daemon.log",
+    level=logging.INFO,
+    format="%(asctime)s:%(levelname)s:%(threadName)s:%(message)s",
+)
+
+
+if __name__ == "__main__":
+    try:
+        run_scheduler()
+    except KeyboardInterrupt:
+        logging.info("Scheduler stopped by user")
@@ -3,8 +3,6 @@ import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 from colorama import Fore
 import logging
-from modules.forecast import run_forecast
-from modules.sentiment import run_sentiment
 import warnings
 
 warnings.simplefilter(action="ignore", category=FutureWarning)
@@ -29,18 +27,34 @@ def main():
         print(intro)
         print("1. Forecast Price")
         print("2. Sentiment Analysis")
-        print("3. Exit")
+        print("3. Intraday Forecast")
+        print("4. Global Forecast")
+        print("5. Exit")
 
         choice = input("Enter your choice: ")
 
+        # Imported on demand: Monte Carlo worker processes are spawned and
+        # re-import this module, and must not load Keras or query Yahoo.
         if choice == "1":
+            from modules.forecast import run_forecast
+
             run_forecast()
         elif choice == "2":
+            from modules.sentiment import run_sentiment
+
             run_sentiment()
         elif choice == "3":
+            from modules.intraday import run_intraday_forecast
+
+            run_intraday_forecast()
+        elif choice == "4":
+            from modules.global_model import run_global_forecast
+
+            run_global_forecast()
+        elif choice == "5":
             break
         else:
-            print("Invalid choice. Please choose 1, 2, or 3.")
+            print("Invalid choice. Please choose 1, 2, 3, 4, or 5.")
 
 
 if __name__ == "__main__":
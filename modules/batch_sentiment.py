@@ -0,0 +1,184 @@
+import numpy as np
+from nltk.sentiment.vader import VaderConstants
+from scipy.sparse import csr_matrix
+
+# Vectorized re-implementation of NLTK's VADER compound score. Texts are
+# tokenized once into a flat token stream; the lexicon, booster, negation,
+# capitalization, "least" and "but" rules are then applied to whole arrays, and
+# the per-text sums come from one sparse (texts x tokens) weight matrix.
+# The rarely triggered special-case idioms ("the bomb", "kiss of death", ...)
+# are not applied.
+
+VADER = VaderConstants()
+PUNCTUATION = set(VADER.PUNC_LIST)
+STRIP_PUNCTUATION = VADER.REGEX_REMOVE_PUNCTUATION
+SO_THIS = {"so", "this"}
+BOOSTER_BIGRAMS = {
+    tuple(phrase.split()) for phrase in VADER.BOOSTER_DICT if " " in phrase
+}
+
+
+def tokenize(text):
+    """Splits a text into VADER tokens: whitespace split, single characters
+    dropped, and leading or trailing punctuation stripped from words."""
+    words = {w for w in STRIP_PUNCTUATION.sub("", text).split() if len(w) > 1}
+    tokens = []
+    for token in text.split():
+        if len(token) <= 1:
+            continue
+        for k in (1, 2, 3, 4):
+            if token[-k:] in PUNCTUATION and token[:-k] in words:
+                token = token[:-k]
+                break
+            if token[:k] in PUNCTUATION and token[k:] in words:
+                token = token[k:]
+                break
+        tokens.append(token)
+    return tokens
+
+
+def shifted(values, by, fill):
+    """Returns `values` shifted right by `by` positions along the flat token stream."""
+    result = np.full_like(values, fill)
+    result[by:] = values[:-by]
+    return result
+
+
+def compound_scores(texts, lexicon):
+    """Returns the VADER compound score of every text as a NumPy array.
+    `lexicon` is the word -> valence dict of a SentimentIntensityAnalyzer."""
+    texts = [text if isinstance(text, str) else str(text) for text in texts]
+
+    # Tokenize the whole batch once into a flat stream. Distinct words are
+    # interned so each per-word property below is looked up once per batch.
+    lower_vocab, raw_vocab = {}, {}
+    lower_ids, raw_ids, text_ids, positions, first_seen = [], [], [], [], []
+    cap_diff = np.zeros(len(texts), dtype=bool)
+    for t, text in enumerate(texts):
+        tokens = tokenize(text)
+        uppers = sum(token.isupper() for token in tokens)
+        cap_diff[t] = 0 < len(tokens) - uppers < len(tokens)
+        # VADER scores repeated tokens with the context of their first occurrence.
+        first = {}
+        offset = len(lower_ids)
+        for i, token in enumerate(tokens):
+            lower_ids.append(lower_vocab.setdefault(token.lower(), len(lower_vocab)))
+            raw_ids.append(raw_vocab.setdefault(token, len(raw_vocab)))
+            first_seen.append(offset + first.setdefault(token, i))
+        text_ids.extend([t] * len(tokens))
+        positions.extend(range(len(tokens)))
+
+    counts = np.bincount(np.asarray(text_ids, dtype=np.int64), minlength=len(texts))
+    if not lower_ids:
+        return np.zeros(len(texts))
+
+    lower_ids = np.asarray(lower_ids)
+    raw_ids = np.asarray(raw_ids)
+    text_ids = np.asarray(text_ids)
+    position = np.asarray(positions)
+    first_seen = np.asarray(first_seen)
+    lengths = counts[text_ids]
+
+    # Per-word properties, gathered into per-token arrays.
+    lower_words = list(lower_vocab)
+    raw_words = list(raw_vocab)
+
+    def lower_lookup(func, dtype):
+        return np.array([func(w) for w in lower_words], dtype=dtype)[lower_ids]
+
+    def raw_lookup(func, dtype):
+        return np.array([func(w) for w in raw_words], dtype=dtype)[raw_ids]
+
+    valence = lower_lookup(lambda w: lexicon.get(w, 0.0), float)
+    in_lexicon = lower_lookup(lambda w: w in lexicon, bool)
+    booster = lower_lookup(lambda w: VADER.BOOSTER_DICT.get(w, 0.0), float)
+    is_booster = lower_lookup(lambda w: w in VADER.BOOSTER_DICT, bool)
+    negated = lower_lookup(lambda w: w in VADER.NEGATE or "n't" in w, bool)
+    is_least = lower_lookup(lambda w: w == "least", bool)
+    at_or_very = lower_lookup(lambda w: w in ("at", "very"), bool)
+    is_kind = lower_lookup(lambda w: w == "kind", bool)
+    is_of = lower_lookup(lambda w: w == "of", bool)
+    is_but = lower_lookup(lambda w: w == "but", bool)
+    is_upper = raw_lookup(str.isupper, bool)
+    is_never = raw_lookup(lambda w: w == "never", bool)
+    so_this = raw_lookup(lambda w: w in SO_THIS, bool)
+    bigram_pair = np.zeros(len(raw_ids), dtype=bool)
+    for head, tail in BOOSTER_BIGRAMS:
+        head_id, tail_id = raw_vocab.get(head), raw_vocab.get(tail)
+        if head_id is not None and tail_id is not None:
+            bigram_pair |= shifted(raw_ids == head_id, 1, False) & (raw_ids == tail_id)
+    bigram_pair &= position >= 1
+    caps = is_upper & cap_diff[text_ids]
+
+    # Capitalized sentiment words are emphasized.
+    v = valence.copy()
+    v += np.where(caps & in_lexicon, np.where(v > 0, VADER.C_INCR, -VADER.C_INCR), 0)
+
+    # Boosters, dampeners and negations up to three words back.
+    for start_i, damping in ((0, 1.0), (1, 0.95), (2, 0.9)):
+        back = start_i + 1
+        applies = (position > start_i) & ~shifted(in_lexicon, back, True)
+        scalar = np.where(v < 0, -1, 1) * shifted(booster, back, 0.0)
+        scalar += np.where(
+            shifted(is_booster & caps, back, False),
+            np.where(v > 0, VADER.C_INCR, -VADER.C_INCR),
+            0,
+        )
+        v = np.where(applies, v + scalar * damping, v)
+
+        if start_i == 0:
+            factor = np.where(shifted(negated, 1, False), VADER.N_SCALAR, 1.0)
+        elif start_i == 1:
+            never_so = shifted(is_never, 2, False) & shifted(so_this, 1, False)
+            factor = np.where(
+                never_so,
+                1.5,
+                np.where(shifted(negated, 2, False), VADER.N_SCALAR, 1.0),
+            )
+        else:
+            never_so = (
+                shifted(is_never, 3, False) & shifted(so_this, 2, False)
+            ) | shifted(so_this, 1, False)
+            factor = np.where(
+                never_so,
+                1.25,
+                np.where(shifted(negated, 3, False), VADER.N_SCALAR, 1.0),
+            )
+        v = np.where(applies, v * factor, v)
+        if start_i == 2:
+            # "kind of" / "sort of" in the two words before dampen the word.
+            bigram = shifted(bigram_pair, 1, False) | shifted(bigram_pair, 2, False)
+            v = np.where(applies & bigram, v + VADER.B_DECR, v)
+
+    # "least" negates unless preceded by "at" or "very".
+    least = (position > 0) & shifted(is_least & ~in_lexicon, 1, False)
+    least &= ~((position > 1) & shifted(at_or_very, 2, False))
+    v = np.where(least, v * VADER.N_SCALAR, v)
+
+    # Non-lexicon words, boosters and the "kind" of "kind of" carry no valence.
+    kind_of = is_kind & (position < lengths - 1) & np.append(is_of[1:], False)
+    v = np.where(in_lexicon & ~is_booster & ~kind_of, v, 0.0)
+    v = v[first_seen]
+
+    # "but" halves the words before it and amplifies the words after it.
+    but_position = np.full(len(texts), np.iinfo(np.int64).max)
+    np.minimum.at(but_position, text_ids[is_but], position[is_but])
+    but_at = but_position[text_ids]
+    weights = np.where(position < but_at, 0.5, np.where(position > but_at, 1.5, 1.0))
+    weights = np.where(but_at == np.iinfo(np.int64).max, 1.0, weights)
+
+    term_weights = csr_matrix(
+        (weights, (text_ids, np.arange(len(text_ids)))),
+        shape=(len(texts), len(text_ids)),
+    )
+    sums = term_weights @ v
+
+    # Exclamation and question mark emphasis.
+    marks = np.array(texts, dtype=str)
+    exclamations = np.minimum(np.char.count(marks, "!"), 4) * 0.292
+    questions = np.char.count(marks, "?")
+    questions = np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0))
+    emphasis = exclamations + questions
+    sums = sums + np.sign(sums) * emphasis
+
+    return np.where(counts > 0, sums / np.sqrt(sums * sums + 15), 0.0)
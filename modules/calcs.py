@@ -130,29 +130,6 @@ def interpret_drawdown(drawdown):
         )
 
 
-def calculate_rsi(data, window=14):
-    """Calculates the Relative Strength Index (RSI) given a set of data and a window.
-    The RSI is a momentum indicator that measures the magnitude of recent price changes
-    to evaluate overbought or oversold conditions in the price of a stock or other asset.
-    """
-    try:
-        diff = data.diff(1)
-        gain = diff.where(diff > 0, 0)
-        loss = -diff.where(diff < 0, 0)
-
-        avg_gain = gain.rolling(window=window, min_periods=1).mean()
-        avg_loss = loss.rolling(window=window, min_periods=1).mean()
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
-    except Exception as e:
-        logging.error(f"Error calculating RSI: {e}")
-        print(Fore.RED + f"Error calculating RSI: {e}" + Fore.RESET)
-        return None
-
-
 def predict_future_prices(model, scaler, current_features, selected_features):
     """Predicts future prices given a model, a scaler, a set of current features, and a set of selected features."""
     try:
@@ -0,0 +1,244 @@
+from colorama import Fore
+import logging
+import numpy as np
+import pandas as pd
+
+# Raw price columns every feature is ultimately built from.
+BASE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Registry of feature nodes. Each entry declares the columns or features it
+# reads, the number of rows it looks at (None when the value depends on the
+# whole history, e.g. an EMA or a cumulative sum) and the function computing it
+# from its input series.
+FEATURES = {}
+
+
+def register_feature(name, inputs, window=None):
+    """Registers `func(*input_series)` as the feature `name`."""
+
+    def decorator(func):
+        FEATURES[name] = {"inputs": list(inputs), "window": window, "func": func}
+        return func
+
+    return decorator
+
+
+def resolve_features(names, available=()):
+    """Returns the features needed for `names`, dependencies first. Unregistered
+    names found in `available` (columns joined from elsewhere) are used as-is."""
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order or name in BASE_COLUMNS:
+            return
+        if name not in FEATURES and name in available:
+            return
+        if name not in FEATURES:
+            raise KeyError(f"Unknown feature: {name}")
+        if name in visiting:
+            raise ValueError(f"Circular feature dependency at {name}")
+        visiting.add(name)
+        for dependency in FEATURES[name]["inputs"]:
+            visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def feature_lookback(names, seeded=()):
+    """Returns how many past rows `names` need besides the current one,
+    or None if any of them depends on the whole history. Features in `seeded`
+    are supplied by the caller and count as needing no history."""
+
+    def lookback(name):
+        if name in BASE_COLUMNS or name in seeded:
+            return 0
+        node = FEATURES[name]
+        if node["window"] is None:
+            return None
+        inputs = [lookback(dependency) for dependency in node["inputs"]]
+        if None in inputs:
+            return None
+        return node["window"] - 1 + max(inputs, default=0)
+
+    lookbacks = [lookback(name) for name in names]
+    return None if None in lookbacks else max(lookbacks, default=0)
+
+
+def compute_features(stock_data, names, cache=None):
+    """Computes only the requested features and their dependencies, in dependency
+    order. Intermediate results are memoized in `cache`, which may be pre-seeded
+    with series computed elsewhere. Returns a DataFrame with one column per name."""
+    cache = {} if cache is None else cache
+    for name in resolve_features(names, stock_data.columns):
+        if name in cache:
+            continue
+        node = FEATURES[name]
+        inputs = [
+            cache[dependency] if dependency in cache else stock_data[dependency]
+            for dependency in node["inputs"]
+        ]
+        cache[name] = node["func"](*inputs)
+
+    return pd.DataFrame(
+        {name: cache[name] if name in cache else stock_data[name] for name in names},
+        index=stock_data.index,
+    )
+
+
+# Trend
+
+
+@register_feature("SMA_50", ["Close"], window=50)
+def sma_50(close):
+    return close.rolling(window=50).mean()
+
+
+@register_feature("SMA_200", ["Close"], window=200)
+def sma_200(close):
+    return close.rolling(window=200).mean()
+
+
+@register_feature("EMA_12", ["Close"])
+def ema_12(close):
+    return close.ewm(span=12, adjust=False).mean()
+
+
+@register_feature("EMA_26", ["Close"])
+def ema_26(close):
+    return close.ewm(span=26, adjust=False).mean()
+
+
+@register_feature("MACD", ["EMA_12", "EMA_26"], window=1)
+def macd(ema_12, ema_26):
+    return ema_12 - ema_26
+
+
+# Momentum
+
+
+def calculate_rsi(data, window=14):
+    """Calculates the Relative Strength Index (RSI) given a set of data and a window.
+    The RSI is a momentum indicator that measures the magnitude of recent price changes
+    to evaluate overbought or oversold conditions in the price of a stock or other asset.
+    """
+    try:
+        diff = data.diff(1)
+        gain = diff.where(diff > 0, 0)
+        loss = -diff.where(diff < 0, 0)
+
+        avg_gain = gain.rolling(window=window, min_periods=1).mean()
+        avg_loss = loss.rolling(window=window, min_periods=1).mean()
+
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+
+        return rsi
+    except Exception as e:
+        logging.error(f"Error calculating RSI: {e}")
+        print(Fore.RED + f"Error calculating RSI: {e}" + Fore.RESET)
+        return None
+
+
+@register_feature("RSI", ["Close"], window=15)
+def rsi(close):
+    return calculate_rsi(close, window=14)
+
+
+@register_feature("Daily_Return", ["Close"], window=2)
+def daily_return(close):
+    return close.pct_change()
+
+
+def register_lag(name, source, lag):
+    register_feature(name, [source], window=lag + 1)(lambda series: series.shift(lag))
+
+
+for lag in range(1, 6):
+    register_lag(f"Close_Lag_{lag}", "Close", lag)
+    register_lag(f"Daily_Return_Lag_{lag}", "Daily_Return", lag)
+
+
+@register_feature("Rolling_Mean_Close", ["Close"], window=10)
+def rolling_mean_close(close):
+    return close.rolling(window=10).mean()
+
+
+@register_feature("Rolling_Std_Close", ["Close"], window=10)
+def rolling_std_close(close):
+    return close.rolling(window=10).std()
+
+
+@register_feature("Lowest_Low_14", ["Low"], window=14)
+def lowest_low_14(low):
+    return low.rolling(window=14).min()
+
+
+@register_feature("Highest_High_14", ["High"], window=14)
+def highest_high_14(high):
+    return high.rolling(window=14).max()
+
+
+@register_feature("Stoch_K", ["Close", "Lowest_Low_14", "Highest_High_14"], window=1)
+def stoch_k(close, lowest_low, highest_high):
+    # A flat window (common in illiquid minute bars) has no range: NaN, not ±inf.
+    return 100 * (close - lowest_low) / (highest_high - lowest_low).replace(0, np.nan)
+
+
+@register_feature("Stoch_D", ["Stoch_K"], window=3)
+def stoch_d(stoch_k):
+    return stoch_k.rolling(window=3).mean()
+
+
+# Volatility
+
+
+@register_feature("SMA_20", ["Close"], window=20)
+def sma_20(close):
+    return close.rolling(window=20).mean()
+
+
+@register_feature("Std_20", ["Close"], window=20)
+def std_20(close):
+    return close.rolling(window=20).std()
+
+
+@register_feature("BB_Upper", ["SMA_20", "Std_20"], window=1)
+def bb_upper(sma_20, std_20):
+    return sma_20 + 2 * std_20
+
+
+@register_feature("BB_Lower", ["SMA_20", "Std_20"], window=1)
+def bb_lower(sma_20, std_20):
+    return sma_20 - 2 * std_20
+
+
+@register_feature("BB_Width", ["BB_Upper", "BB_Lower", "SMA_20"], window=1)
+def bb_width(bb_upper, bb_lower, sma_20):
+    return (bb_upper - bb_lower) / sma_20
+
+
+@register_feature("True_Range", ["High", "Low", "Close"], window=2)
+def true_range(high, low, close):
+    previous_close = close.shift(1)
+    return pd.concat(
+        [high - low, (high - previous_close).abs(), (low - previous_close).abs()],
+        axis=1,
+    ).max(axis=1)
+
+
+@register_feature("ATR", ["True_Range"])
+def atr(true_range):
+    return true_range.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+
+
+# Volume
+
+
+@register_feature("OBV", ["Close", "Volume"])
+def obv(close, volume):
+    return (np.sign(close.diff()).fillna(0) * volume).cumsum()
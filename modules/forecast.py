@@ -1,6 +1,6 @@
 import logging
 import datetime
-import pandas as pd
+import os
 from colorama import Fore
 from modules.calcs import (
     calculate_sharpe_ratio,
@@ -11,11 +11,16 @@ from modules.calcs import (
     risk_free_rate,
     predict_future_prices,
 )
+from modules.config_manager import read_config
+from modules.sentiment_store import join_sentiment
+from modules.simulation import run_simulation
 from modules.training import (
+    SELECTED_FEATURES,
     train_model,
     get_stock_data,
     preprocess_data,
     create_features,
+    export_inference_artifact,
 )
 
 
@@ -84,7 +89,13 @@ def run_forecast():
             print(interpret_ratio(sharpe_ratio, "Sharpe Ratio"))
             print(interpret_ratio(sortino_ratio, "Sortino Ratio"))
             print(interpret_drawdown(max_drawdown))
-            features = create_features(stock_data)
+            run_simulation(daily_returns, stock_data["Close"].iloc[-1])
+            selected_features = list(SELECTED_FEATURES)
+            if read_config().get("use_sentiment_feature", False):
+                stock_data = join_sentiment(stock_data, ticker)
+                selected_features.append("Sentiment")
+
+            features = create_features(stock_data, selected_features)
             if features is None:
                 logging.warning("Error creating features")
                 print(
@@ -100,38 +111,26 @@ def run_forecast():
 
                 continue
 
-            selected_features = [
-                "Open",
-                "High",
-                "Low",
-                "Volume",
-                "SMA_50",
-                "SMA_200",
-                "MACD",
-                "RSI",
-            ]
             X = features[selected_features]
             y = features["Future_Close"]
 
-            lstm_model, scaler = train_model(X, y)
+            lstm_model, scaler = train_model(
+                X, y, checkpoint_name=f"{ticker.upper()}_{start_date}_{end_date}"
+            )
             if lstm_model is not None and scaler is not None:
                 future_date = datetime.datetime.now() + datetime.timedelta(days=1)
-                future_features = pd.DataFrame(
-                    [
-                        [
-                            stock_data["Open"].iloc[-1],
-                            stock_data["High"].iloc[-1],
-                            stock_data["Low"].iloc[-1],
-                            stock_data["Volume"].iloc[-1],
-                            stock_data["SMA_50"].iloc[-1],
-                            stock_data["SMA_200"].iloc[-1],
-                            stock_data["MACD"].iloc[-1],
-                            stock_data["RSI"].iloc[-1],
-                        ]
-                    ],
-                    columns=selected_features,
+                future_features = stock_data[selected_features].iloc[[-1]]
+
+                # Exported for `serve.py`, which forecasts later without Keras.
+                export_inference_artifact(
+                    lstm_model,
+                    scaler,
+                    selected_features,
+                    os.path.join(
+                        read_config().get("artifact_dir", "models"),
+                        f"{ticker.upper()}.npz",
+                    ),
                 )
-
                 future_price_lstm = predict_future_prices(
                     lstm_model, scaler, future_features, selected_features
                 )
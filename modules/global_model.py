@@ -0,0 +1,312 @@
+from colorama import Fore
+from keras.layers import LSTM, Concatenate, Dense, Embedding, Flatten, Input
+from keras.models import Model
+import hashlib
+import logging
+import time
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from modules.config_manager import read_config
+from modules.ingestion import download_universe
+from modules.training import (
+    SELECTED_FEATURES,
+    create_features,
+    days_ahead,
+    fit_with_budget,
+    get_training_budget,
+    preprocess_data,
+    train_model,
+)
+
+# One LSTM for a whole universe. Features and targets are standardized per
+# ticker, so names trading at $5 and $500 share the same scale, and the rows of
+# every ticker are stacked into large batches for a single fit.
+
+DEFAULT_GLOBAL_SETTINGS = {"embedding_dim": 8, "batch_size": 1024}
+
+
+def get_global_settings():
+    """Returns the global model settings from the config, filled in with defaults."""
+    settings = dict(DEFAULT_GLOBAL_SETTINGS)
+    settings.update(read_config().get("global_model", {}))
+    return settings
+
+
+def prepare_universe(frames, selected_features=SELECTED_FEATURES):
+    """Builds the features of every downloaded ticker. Returns a dict mapping each
+    ticker to its features, Future_Close target and latest feature row; tickers
+    with too little history are skipped."""
+    datasets = {}
+    for ticker, frame in frames.items():
+        stock_data = preprocess_data(frame.copy())
+        if stock_data is None:
+            continue
+        features = create_features(stock_data, selected_features)
+        latest = stock_data[selected_features].iloc[[-1]]
+        if features is None or len(features) < 2 or latest.isna().any(axis=None):
+            logging.warning(f"Not enough history to model {ticker}")
+            continue
+        datasets[ticker] = {
+            "X": features[selected_features],
+            "y": features["Future_Close"],
+            "latest": latest,
+            "last_close": stock_data["Close"].iloc[-1],
+        }
+    return datasets
+
+
+def split_ticker(dataset):
+    """Splits one ticker the same way `train_model` does, so the global and
+    per-ticker models are scored on the same holdout rows."""
+    return train_test_split(dataset["X"], dataset["y"], test_size=0.2, random_state=42)
+
+
+def stack_universe(datasets):
+    """Fits a feature and a target scaler per ticker on its training rows and
+    stacks the scaled rows of all tickers. Returns the train and test arrays
+    (features, ticker ids, targets) and the scalers as arrays indexed by ticker id."""
+    tickers = list(datasets)
+    scalers = {
+        "tickers": tickers,
+        "x_mean": [],
+        "x_scale": [],
+        "y_mean": [],
+        "y_scale": [],
+    }
+    train, test = ([], [], []), ([], [], [])
+
+    for ticker_id, ticker in enumerate(tickers):
+        X_train, X_test, y_train, y_test = split_ticker(datasets[ticker])
+        x_scaler = StandardScaler().fit(X_train)
+        y_scaler = StandardScaler().fit(y_train.to_numpy().reshape(-1, 1))
+        scalers["x_mean"].append(x_scaler.mean_)
+        scalers["x_scale"].append(x_scaler.scale_)
+        scalers["y_mean"].append(y_scaler.mean_[0])
+        scalers["y_scale"].append(y_scaler.scale_[0])
+
+        for arrays, X, y in ((train, X_train, y_train), (test, X_test, y_test)):
+            arrays[0].append(x_scaler.transform(X).astype(np.float32))
+            arrays[1].append(np.full(len(X), ticker_id, dtype=np.int32))
+            arrays[2].append(
+                y_scaler.transform(y.to_numpy().reshape(-1, 1)).astype(np.float32)
+            )
+
+    scalers = {
+        key: value if key == "tickers" else np.asarray(value)
+        for key, value in scalers.items()
+    }
+    train = tuple(np.concatenate(part) for part in train)
+    test = tuple(np.concatenate(part) for part in test)
+    return train, test, scalers
+
+
+def build_global_model(n_features, n_tickers, config, embedding_dim=8):
+    """Builds the shared LSTM. With `embedding_dim` > 0 a learned ticker embedding
+    is concatenated to the LSTM output so the model can keep per-ticker offsets."""
+    features = Input(shape=(n_features, 1), name="features")
+    ticker_id = Input(shape=(1,), dtype="int32", name="ticker_id")
+    hidden = LSTM(units=250, activation="relu")(features)
+    if embedding_dim:
+        embedded = Flatten()(Embedding(n_tickers, embedding_dim)(ticker_id))
+        hidden = Concatenate()([hidden, embedded])
+    output = Dense(units=days_ahead)(hidden)
+
+    model = Model(inputs=[features, ticker_id], outputs=output)
+    model.compile(optimizer=config["optimizer"], loss=config["loss"])
+    return model
+
+
+def train_global_model(datasets, settings=None):
+    """Trains one model on the stacked universe with a single `fit` call, within
+    the training budget's `job_seconds`. The checkpoint is keyed by the ticker
+    list, so an interrupted run resumes only for the same universe.
+    Returns the model and the per-ticker scalers."""
+    config = read_config()
+    settings = settings or get_global_settings()
+
+    try:
+        if not datasets:
+            logging.warning("No tickers to train the global model on.")
+            print(Fore.RED + "No tickers to train the global model on." + Fore.RESET)
+            return None, None
+
+        (X_train, ids_train, y_train), (X_test, ids_test, y_test), scalers = (
+            stack_universe(datasets)
+        )
+        model = build_global_model(
+            X_train.shape[1],
+            len(scalers["tickers"]),
+            config,
+            settings["embedding_dim"],
+        )
+        job_seconds = get_training_budget()["job_seconds"]
+        universe = hashlib.sha1(",".join(scalers["tickers"]).encode()).hexdigest()
+
+        fit_with_budget(
+            model,
+            [X_train[:, :, None], ids_train[:, None]],
+            y_train,
+            ([X_test[:, :, None], ids_test[:, None]], y_test),
+            settings["batch_size"],
+            f"global-{universe[:12]}",
+            time.monotonic() + job_seconds if job_seconds else None,
+            {
+                "x_mean": scalers["x_mean"],
+                "x_scale": scalers["x_scale"],
+                "y_mean": scalers["y_mean"],
+                "y_scale": scalers["y_scale"],
+                "rows": len(X_train) + len(X_test),
+            },
+        )
+
+        return model, scalers
+    except Exception as e:
+        logging.error(f"Error training global model: {e}")
+        print(Fore.RED + f"Error training global model: {e}" + Fore.RESET)
+        return None, None
+
+
+def predict_global(model, scalers, tickers, features, batch_size=4096):
+    """Predicts one price per row of `features`, where row i belongs to
+    `tickers[i]`, in a single batched `predict` call."""
+    index = {ticker: i for i, ticker in enumerate(scalers["tickers"])}
+    ticker_ids = np.array([index[ticker] for ticker in tickers], dtype=np.int32)
+    values = np.asarray(features, dtype=np.float64)
+    scaled = (values - scalers["x_mean"][ticker_ids]) / scalers["x_scale"][ticker_ids]
+
+    predicted = model.predict(
+        [scaled.astype(np.float32)[:, :, None], ticker_ids[:, None]],
+        batch_size=batch_size,
+        verbose=0,
+    )[:, 0]
+    return predicted * scalers["y_scale"][ticker_ids] + scalers["y_mean"][ticker_ids]
+
+
+def predict_universe(model, scalers, datasets):
+    """Forecasts the next close of every ticker. Returns a frame indexed by ticker
+    with the last close, the forecast and the expected change in percent."""
+    tickers = [ticker for ticker in scalers["tickers"] if ticker in datasets]
+    latest = pd.concat([datasets[ticker]["latest"] for ticker in tickers])
+    predicted = predict_global(model, scalers, tickers, latest)
+    last_close = np.array([datasets[ticker]["last_close"] for ticker in tickers])
+    return pd.DataFrame(
+        {
+            "Last_Close": last_close,
+            "Forecast": predicted,
+            "Change_%": (predicted - last_close) / last_close * 100,
+        },
+        index=pd.Index(tickers, name="Ticker"),
+    )
+
+
+def evaluate_global_model(model, scalers, datasets):
+    """Returns the holdout mean absolute error of the global model per ticker, in
+    price units, scoring all tickers in one batched prediction."""
+    tickers, features, targets = [], [], []
+    for ticker in scalers["tickers"]:
+        _, X_test, _, y_test = split_ticker(datasets[ticker])
+        tickers.extend([ticker] * len(X_test))
+        features.append(X_test)
+        targets.append(y_test.to_numpy())
+
+    predicted = predict_global(model, scalers, tickers, pd.concat(features))
+    errors = pd.Series(np.abs(predicted - np.concatenate(targets)), index=tickers)
+    return errors.groupby(level=0, sort=False).mean()
+
+
+def evaluate_per_ticker_models(datasets):
+    """Trains one model per ticker with `train_model`, as the forecast does, and
+    returns the holdout mean absolute error per ticker and the total seconds."""
+    errors = {}
+    start_time = time.perf_counter()
+    for ticker, dataset in datasets.items():
+        model, scaler = train_model(dataset["X"], dataset["y"])
+        if model is None:
+            continue
+        _, X_test, _, y_test = split_ticker(dataset)
+        scaled = scaler.transform(X_test)
+        predicted = model.predict(scaled[:, :, None], verbose=0)[:, 0]
+        errors[ticker] = np.abs(predicted - y_test.to_numpy()).mean()
+    return pd.Series(errors), time.perf_counter() - start_time
+
+
+def compare_models(
+    global_errors, global_seconds, per_ticker_errors, per_ticker_seconds, datasets
+):
+    """Prints the holdout error of both approaches, relative to each ticker's
+    mean price so that tickers of different price levels can be compared."""
+    mean_price = pd.Series(
+        {ticker: dataset["y"].mean() for ticker, dataset in datasets.items()}
+    )
+    comparison = pd.DataFrame(
+        {"Global_MAE": global_errors, "Per_Ticker_MAE": per_ticker_errors}
+    ).dropna()
+    comparison["Global_MAE_%"] = comparison["Global_MAE"] / mean_price * 100
+    comparison["Per_Ticker_MAE_%"] = comparison["Per_Ticker_MAE"] / mean_price * 100
+
+    print(
+        f"Global model: {global_seconds:.1f}s, median holdout error "
+        f"{comparison['Global_MAE_%'].median():.2f}% of price"
+    )
+    print(
+        f"Per-ticker models: {per_ticker_seconds:.1f}s, median holdout error "
+        f"{comparison['Per_Ticker_MAE_%'].median():.2f}% of price"
+    )
+    logging.info(f"Global vs per-ticker models:\n{comparison}")
+    return comparison
+
+
+def run_global_forecast():
+    """Runs the global forecast. Prompts for a list of tickers and a date range,
+    trains one model on all of them and forecasts every ticker's next close."""
+    logging.info("---- Starting a global model run ----")
+    symbols = [
+        s.strip().upper()
+        for s in input("Enter the stock ticker symbols (comma-separated): ").split(",")
+        if s.strip()
+    ]
+    if not symbols:
+        print(Fore.RED + "No ticker symbols entered." + Fore.RESET)
+        return
+    start_date = input("Enter the start date (YYYY-MM-DD): ")
+    end_date = input("Enter the end date (YYYY-MM-DD): ")
+    compare = input("Compare with per-ticker models? (yes/no): ").lower() == "yes"
+
+    frames, _ = download_universe(symbols, start_date, end_date)
+    datasets = prepare_universe(frames)
+
+    start_time = time.perf_counter()
+    model, scalers = train_global_model(datasets)
+    global_seconds = time.perf_counter() - start_time
+    if model is None:
+        return
+    logging.info(
+        f"Trained the global model on {len(datasets)} tickers in {global_seconds:.1f}s"
+    )
+
+    forecasts = predict_universe(model, scalers, datasets)
+    for ticker, row in forecasts.iterrows():
+        direction = (
+            Fore.GREEN + "up" + Fore.RESET
+            if row["Change_%"] > 0
+            else Fore.RED + "down" + Fore.RESET
+        )
+        print(
+            f"{ticker}: forecasted close {row['Forecast']:.2f}, {direction} "
+            f"{abs(row['Change_%']):.2f}% from {row['Last_Close']:.2f}"
+        )
+
+    if compare:
+        global_errors = evaluate_global_model(model, scalers, datasets)
+        per_ticker_errors, per_ticker_seconds = evaluate_per_ticker_models(datasets)
+        compare_models(
+            global_errors,
+            global_seconds,
+            per_ticker_errors,
+            per_ticker_seconds,
+            datasets,
+        )
+
+    logging.info("---- Global model run completed successfully ----")
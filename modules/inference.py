@@ -0,0 +1,83 @@
+from colorama import Fore
+import logging
+import numpy as np
+
+# This module must stay free of Keras/TensorFlow imports so that a forecast
+# can be served from an exported artifact without loading the full framework.
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0, 1),
+    "linear": lambda x: x,
+}
+
+
+def load_inference_artifact(path):
+    """Loads an artifact written by `export_inference_artifact` into a dict of NumPy arrays."""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            artifact = {key: data[key] for key in data.files}
+        artifact["selected_features"] = [str(f) for f in artifact["selected_features"]]
+        artifact["activation"] = str(artifact["activation"])
+        artifact["recurrent_activation"] = str(artifact["recurrent_activation"])
+        return artifact
+    except Exception as e:
+        logging.error(f"Error loading inference artifact {path}: {e}")
+        print(Fore.RED + f"Error loading inference artifact: {e}" + Fore.RESET)
+        return None
+
+
+def lstm_forward(artifact, inputs):
+    """Runs the exported LSTM and Dense layers over `inputs` shaped
+    (samples, timesteps, channels). Gate order follows Keras: input, forget, cell, output."""
+    activation = ACTIVATIONS[artifact["activation"]]
+    recurrent_activation = ACTIVATIONS[artifact["recurrent_activation"]]
+    kernel = artifact["lstm_kernel"]
+    recurrent_kernel = artifact["lstm_recurrent_kernel"]
+    bias = artifact["lstm_bias"]
+    units = recurrent_kernel.shape[0]
+
+    h = np.zeros((inputs.shape[0], units), dtype=kernel.dtype)
+    c = np.zeros_like(h)
+    # The input projection does not depend on the state, so do it for all steps at once.
+    projected = inputs @ kernel + bias
+    for t in range(inputs.shape[1]):
+        z = projected[:, t, :] + h @ recurrent_kernel
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units : 2 * units])
+        g = activation(z[:, 2 * units : 3 * units])
+        o = recurrent_activation(z[:, 3 * units :])
+        c = f * c + i * g
+        h = o * activation(c)
+
+    return h @ artifact["dense_kernel"] + artifact["dense_bias"]
+
+
+def predict_prices(artifact, features):
+    """Predicts one price per row of `features` (a frame holding the artifact's
+    selected features)."""
+    selected_features = artifact["selected_features"]
+    values = np.asarray(features[selected_features], dtype=np.float64)
+    scaled = (values - artifact["scaler_mean"]) / artifact["scaler_scale"]
+    reshaped = scaled.reshape((-1, len(selected_features), 1)).astype(
+        artifact["lstm_kernel"].dtype
+    )
+    return lstm_forward(artifact, reshaped)[:, 0]
+
+
+def predict_future_prices_fast(artifact, current_features, selected_features):
+    """Predicts future prices from an exported artifact instead of a Keras model."""
+    try:
+        if list(selected_features) != artifact["selected_features"]:
+            raise ValueError(
+                f"Artifact was trained on {artifact['selected_features']}, got {list(selected_features)}"
+            )
+
+        return predict_prices(artifact, current_features)[0]
+
+    except Exception as e:
+        logging.error(f"Error predicting future prices from artifact: {e}")
+        print(Fore.RED + f"Error predicting future prices: {e}" + Fore.RESET)
+        return None
@@ -0,0 +1,269 @@
+from colorama import Fore
+from concurrent.futures import ThreadPoolExecutor
+import io
+import logging
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+import pandas as pd
+import yfinance as yf
+from yfinance.exceptions import (
+    YFPricesMissingError,
+    YFTickerMissingError,
+    YFTzMissingError,
+)
+from modules.config_manager import read_config
+
+DEFAULT_INGESTION_SETTINGS = {
+    "batch_size": 50,
+    "max_workers": 4,
+    "requests_per_second": 2.0,
+    "burst": 4,
+    "max_retries": 3,
+    "backoff_base": 1.0,
+    "timeout": 30,
+}
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Each request takes one token; tokens refill at
+    `rate` per second up to `capacity`, so short bursts are allowed but the
+    sustained request rate never exceeds `rate`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_ingestion_settings():
+    """Returns the ingestion settings from the config, filled in with defaults."""
+    settings = dict(DEFAULT_INGESTION_SETTINGS)
+    settings.update(read_config().get("ingestion", {}))
+    return settings
+
+
+def chunk_symbols(symbols, batch_size):
+    """Splits the symbol universe into batches for multi-ticker requests."""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    return [symbols[i : i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+
+def is_missing_ticker(error):
+    """Tells whether a yfinance error means Yahoo has no prices for the ticker,
+    as opposed to a failed request that is worth retrying.
+
+    yfinance raises `YFTzMissingError` whenever the timezone lookup fails, which
+    during an outage happens for every ticker once it stops falling back to
+    `.info`, and `YFPricesMissingError` with a status code when Yahoo answered
+    with an HTTP error. Both are treated as failures."""
+    if isinstance(error, YFTzMissingError):
+        return False
+    if isinstance(error, YFPricesMissingError):
+        return "status_code" not in error.debug_info
+    return isinstance(error, YFTickerMissingError)
+
+
+def yf_fetch_batch(batch, start_date, end_date, timeout=30, acquire=None):
+    """Downloads one batch of tickers from Yahoo Finance.
+
+    `yf.download` logs per-ticker failures and returns empty frames, so a
+    network outage would look like a batch of unknown tickers. Each ticker's
+    history is therefore requested on its own, with errors raised, taking one
+    token from `acquire` per request. Tickers Yahoo reports as missing are left
+    out (ledger status "empty"). Returns the frame of the tickers that were
+    downloaded and a dict of the errors of the tickers that failed."""
+    frames = {}
+    errors = {}
+    for ticker in batch:
+        if acquire is not None:
+            acquire()
+        try:
+            frame = yf.Ticker(ticker).history(
+                start=start_date, end=end_date, timeout=timeout, raise_errors=True
+            )
+        except Exception as e:
+            if is_missing_ticker(e):
+                logging.info(f"No data for {ticker}: {e}")
+            else:
+                errors[ticker] = e
+            continue
+        if not frame.empty:
+            if frame.index.tz is not None:
+                # Match yf.download: daily bars are indexed by tz-naive dates.
+                frame.index = frame.index.tz_localize(None)
+            frames[ticker] = frame
+    return (pd.concat(frames, axis=1) if frames else pd.DataFrame()), errors
+
+
+def http_fetch_batch(base_url):
+    """Returns a batch fetcher for a plain HTTP price endpoint.
+
+    The endpoint is queried as `base_url?symbols=A,B&start=...&end=...` and must
+    answer with a long-format CSV (Date, Ticker, Open, High, Low, Close, Volume).
+    The whole batch is one request, so a failure fails every ticker in it.
+    This lets the scheduler run against a local stand-in server."""
+
+    def fetch(batch, start_date, end_date, timeout=30, acquire=None):
+        if acquire is not None:
+            acquire()
+        query = urllib.parse.urlencode(
+            {"symbols": ",".join(batch), "start": start_date, "end": end_date}
+        )
+        with urllib.request.urlopen(f"{base_url}?{query}", timeout=timeout) as response:
+            text = response.read().decode("utf-8")
+        frame = pd.read_csv(io.StringIO(text), parse_dates=["Date"])
+        if frame.empty:
+            return pd.DataFrame(), {}
+        frame["Ticker"] = frame["Ticker"].str.upper()
+        return (
+            frame.set_index(["Date", "Ticker"])
+            .unstack("Ticker")
+            .swaplevel(axis=1)
+            .sort_index(axis=1)
+        ), {}
+
+    return fetch
+
+
+def split_batch_frame(frame, batch):
+    """Splits a multi-ticker download into one OHLCV frame per ticker.
+    Tickers with no rows are left out."""
+    frames = {}
+    if frame is None or frame.empty:
+        return frames
+
+    if not isinstance(frame.columns, pd.MultiIndex):
+        frame = pd.concat({batch[0]: frame}, axis=1)
+
+    # Depending on the source the ticker is the outer or the inner column level.
+    ticker_level = 0 if set(frame.columns.get_level_values(0)) & set(batch) else 1
+    for ticker in batch:
+        if ticker not in frame.columns.get_level_values(ticker_level):
+            continue
+        ticker_frame = frame.xs(ticker, axis=1, level=ticker_level)
+        ticker_frame = ticker_frame[
+            [c for c in PRICE_COLUMNS if c in ticker_frame.columns]
+        ].dropna(how="all")
+        if not ticker_frame.empty:
+            frames[ticker] = ticker_frame
+    return frames
+
+
+def fetch_batch_with_retries(fetch_batch, batch, start_date, end_date, bucket, settings):
+    """Fetches one batch, retrying only the tickers that failed, with exponential
+    backoff and jitter. The fetcher takes one token from `bucket` per HTTP request.
+    Returns the per-ticker frames and, per ticker, the number of attempts and the
+    last error (None once it succeeded)."""
+    frames = {}
+    attempts = {}
+    errors = {}
+    pending = list(batch)
+    for attempt in range(1, settings["max_retries"] + 2):
+        try:
+            frame, failed = fetch_batch(
+                pending,
+                start_date,
+                end_date,
+                timeout=settings["timeout"],
+                acquire=bucket.acquire,
+            )
+        except Exception as e:
+            frame, failed = None, {ticker: e for ticker in pending}
+        frames.update(
+            split_batch_frame(frame, [t for t in pending if t not in failed])
+        )
+        for ticker in pending:
+            attempts[ticker] = attempt
+            errors[ticker] = failed.get(ticker)
+
+        pending = [ticker for ticker in pending if ticker in failed]
+        if not pending:
+            break
+        logging.warning(
+            f"Batch {batch[0]}..{batch[-1]} attempt {attempt}: {len(pending)} "
+            f"tickers failed, e.g. {pending[0]}: {failed[pending[0]]}"
+        )
+        if attempt <= settings["max_retries"]:
+            delay = settings["backoff_base"] * 2 ** (attempt - 1)
+            time.sleep(delay + random.uniform(0, settings["backoff_base"]))
+    return frames, attempts, errors
+
+
+def download_universe(symbols, start_date, end_date, fetch_batch=None, settings=None):
+    """Downloads a universe of symbols in batched requests over a bounded worker pool.
+
+    Returns a dict of per-ticker frames and a status ledger mapping each symbol to
+    its status ("ok", "empty" when the source has no prices for it, "failed" when
+    its requests kept failing), the number of attempts, the row count and the
+    error. Yahoo cannot tell an unknown symbol from a failed timezone lookup, so
+    unknown symbols end up "failed" after the retries."""
+    settings = settings or get_ingestion_settings()
+    fetch_batch = fetch_batch or yf_fetch_batch
+    batches = chunk_symbols(symbols, settings["batch_size"])
+    bucket = TokenBucket(settings["requests_per_second"], settings["burst"])
+
+    frames = {}
+    ledger = {}
+    lock = threading.Lock()
+
+    def run_batch(batch):
+        batch_frames, attempts, errors = fetch_batch_with_retries(
+            fetch_batch, batch, start_date, end_date, bucket, settings
+        )
+        with lock:
+            for ticker in batch:
+                error = errors[ticker]
+                if error is not None:
+                    status, rows = "failed", 0
+                elif ticker in batch_frames:
+                    status, rows = "ok", len(batch_frames[ticker])
+                    frames[ticker] = batch_frames[ticker]
+                else:
+                    status, rows = "empty", 0
+                ledger[ticker] = {
+                    "status": status,
+                    "attempts": attempts[ticker],
+                    "rows": rows,
+                    "error": str(error) if error is not None else None,
+                }
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=settings["max_workers"]) as executor:
+        list(executor.map(run_batch, batches))
+    elapsed = time.perf_counter() - start_time
+
+    failed = [t for t, entry in ledger.items() if entry["status"] == "failed"]
+    empty = [t for t, entry in ledger.items() if entry["status"] == "empty"]
+    logging.info(
+        f"Ingested {len(frames)}/{len(ledger)} symbols in {len(batches)} batches "
+        f"({elapsed:.2f}s, {len(ledger) / max(elapsed, 1e-9):.1f} symbols/s); "
+        f"{len(empty)} empty, {len(failed)} failed"
+    )
+    if failed:
+        print(
+            Fore.RED
+            + f"Failed to download {len(failed)} symbols: {', '.join(failed[:10])}"
+            + Fore.RESET
+        )
+    return frames, ledger
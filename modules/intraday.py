@@ -0,0 +1,289 @@
+from colorama import Fore
+from keras.callbacks import EarlyStopping
+import logging
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+import tensorflow as tf
+from modules.config_manager import read_config
+from modules.features import compute_features, feature_lookback
+from modules.inference import load_inference_artifact, predict_future_prices_fast
+from modules.training import (
+    SELECTED_FEATURES,
+    build_model,
+    days_ahead,
+    export_inference_artifact,
+)
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_INTRADAY_SETTINGS = {"chunk_size": 100000, "validation_split": 0.2}
+
+# Whole-history features carried across chunks as state, with their EMA span.
+SEEDED_FEATURES = {"EMA_12": 12, "EMA_26": 26}
+
+
+def get_intraday_settings():
+    """Returns the intraday settings from the config, filled in with defaults."""
+    settings = dict(DEFAULT_INTRADAY_SETTINGS)
+    settings.update(read_config().get("intraday", {}))
+    return settings
+
+
+def read_minute_bars(path, chunk_size):
+    """Yields minute bars from a CSV (timestamp index, OHLCV columns) in float32 chunks.
+    The first column is the timestamp, whatever its name."""
+    index_column = pd.read_csv(path, nrows=0).columns[0]
+    for chunk in pd.read_csv(
+        path,
+        index_col=0,
+        parse_dates=True,
+        usecols=[index_column, *BAR_COLUMNS],
+        dtype={column: np.float32 for column in BAR_COLUMNS},
+        chunksize=chunk_size,
+    ):
+        yield chunk[BAR_COLUMNS]
+
+
+def seeded_ema(close, span, previous):
+    """EMA with adjust=False that continues from `previous`, the last EMA value
+    of the preceding chunk. Identical to running the EMA over the whole history."""
+    if previous is None:
+        return close.ewm(span=span, adjust=False).mean()
+    seeded = pd.concat([pd.Series([previous], dtype=close.dtype), close.reset_index(drop=True)])
+    ema = seeded.ewm(span=span, adjust=False).mean().iloc[1:]
+    ema.index = close.index
+    return ema
+
+
+def intraday_lookback(selected_features):
+    """Returns how many past bars must be carried between chunks for `selected_features`.
+    The EMAs are carried as state; any other whole-history feature is rejected."""
+    lookback = feature_lookback(selected_features, seeded=SEEDED_FEATURES)
+    if lookback is None:
+        raise ValueError(
+            "Intraday mode only supports features with a bounded window or an EMA"
+        )
+    return lookback
+
+
+def create_intraday_features(chunk, state, selected_features=SELECTED_FEATURES):
+    """Creates float32 features for one chunk of bars, carrying rolling-window state.
+
+    `state` holds the bars needed by the longest window, the last EMA values and
+    the final feature row of the previous chunk, whose Future_Close is the first
+    close of this chunk. It is updated in place. Returns only complete rows."""
+    if "lookback" not in state:
+        state["lookback"] = intraday_lookback(selected_features)
+    tail = state.get("tail")
+    frame = chunk if tail is None else pd.concat([tail, chunk])
+    new_rows = slice(len(frame) - len(chunk), len(frame))
+
+    cache = {}
+    for name, span in SEEDED_FEATURES.items():
+        cache[name] = seeded_ema(chunk["Close"], span, state.get(name)).reindex(
+            frame.index
+        )
+    features = compute_features(
+        frame, list(selected_features) + ["Future_Close"], cache
+    ).iloc[new_rows]
+    features = features.astype(np.float32)
+
+    pending = state.get("pending")
+    if pending is not None:
+        pending = pending.copy()
+        pending["Future_Close"] = chunk["Close"].iloc[0]
+        features = pd.concat([pending, features])
+
+    state["tail"] = frame.iloc[-max(state["lookback"], 1) :]
+    for name in SEEDED_FEATURES:
+        state[name] = cache[name].iloc[-1]
+    state["pending"] = features.iloc[-days_ahead:]
+
+    return features.iloc[:-days_ahead].dropna()
+
+
+def iter_feature_chunks(chunk_source, selected_features=SELECTED_FEATURES, state=None):
+    """Yields feature chunks for every chunk produced by `chunk_source()`.
+    Pass a `state` dict to inspect the final state (e.g. the latest bar) afterwards."""
+    state = {} if state is None else state
+    for chunk in chunk_source():
+        if chunk.empty:
+            continue
+        features = create_intraday_features(chunk, state, selected_features)
+        if not features.empty:
+            yield features
+
+
+def fit_streaming_scaler(
+    chunk_source, selected_features=SELECTED_FEATURES, rows_path=None, state=None
+):
+    """Fits a StandardScaler with one pass over the stream. Returns the scaler and row count.
+
+    With `rows_path`, the float32 feature rows (the selected features followed by
+    Future_Close) are also appended to that file, so training epochs read them
+    back instead of re-parsing the bars and recomputing every feature. `state` is
+    passed to `iter_feature_chunks`."""
+    scaler = StandardScaler()
+    n_rows = 0
+    with open(rows_path or os.devnull, "wb") as file:
+        for features in iter_feature_chunks(chunk_source, selected_features, state):
+            scaler.partial_fit(features[selected_features].to_numpy())
+            n_rows += len(features)
+            if rows_path:
+                features[list(selected_features) + ["Future_Close"]].to_numpy(
+                    dtype=np.float32
+                ).tofile(file)
+    return scaler, n_rows
+
+
+def iter_training_batches(
+    rows_path, n_features, scaler, batch_size, start_row, end_row, chunk_size
+):
+    """Yields scaled (X, y) batches for the rows in [start_row, end_row) of a
+    file written by `fit_streaming_scaler`, reading `chunk_size` rows at a time."""
+    rows = np.memmap(rows_path, dtype=np.float32, mode="r").reshape((-1, n_features + 1))
+    for start in range(start_row, end_row, chunk_size):
+        chunk = np.asarray(rows[start : min(start + chunk_size, end_row)])
+        X = (
+            scaler.transform(chunk[:, :n_features])
+            .astype(np.float32)
+            .reshape((-1, n_features, 1))
+        )
+        y = chunk[:, n_features:]
+        for i in range(0, len(X), batch_size):
+            yield X[i : i + batch_size], y[i : i + batch_size]
+
+
+def make_dataset(
+    rows_path, selected_features, scaler, batch_size, start_row, end_row, chunk_size
+):
+    """Wraps the batch generator in a tf.data pipeline that prefetches the next batch."""
+    return tf.data.Dataset.from_generator(
+        lambda: iter_training_batches(
+            rows_path,
+            len(selected_features),
+            scaler,
+            batch_size,
+            start_row,
+            end_row,
+            chunk_size,
+        ),
+        output_signature=(
+            tf.TensorSpec(shape=(None, len(selected_features), 1), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, 1), dtype=tf.float32),
+        ),
+    ).prefetch(tf.data.AUTOTUNE)
+
+
+def train_intraday_model(chunk_source, selected_features=SELECTED_FEATURES, state=None):
+    """Trains the LSTM on a stream of bar chunks. Peak memory depends on the chunk
+    and batch size, not on the length of the history. The last `validation_split`
+    of the rows (in time order) is held out for validation.
+
+    Features are computed once; the epochs stream them from a temporary float32
+    file. Pass a `state` dict to get the final feature state (e.g. the latest bar)."""
+    config = read_config()
+    settings = get_intraday_settings()
+    fd, rows_path = tempfile.mkstemp(suffix=".f32")
+    os.close(fd)
+
+    try:
+        scaler, n_rows = fit_streaming_scaler(
+            chunk_source, selected_features, rows_path, state
+        )
+        n_train = int(n_rows * (1 - settings["validation_split"]))
+        if n_train < 2 or n_rows - n_train < 1:
+            logging.warning("Not enough samples to train the intraday model.")
+            print(Fore.RED + "Not enough samples to train the model." + Fore.RESET)
+            return None, None
+
+        train_data = make_dataset(
+            rows_path,
+            selected_features,
+            scaler,
+            config["batch_size"],
+            0,
+            n_train,
+            settings["chunk_size"],
+        )
+        validation_data = make_dataset(
+            rows_path,
+            selected_features,
+            scaler,
+            config["batch_size"],
+            n_train,
+            n_rows,
+            settings["chunk_size"],
+        )
+
+        model = build_model(len(selected_features), config)
+        early_stopping = EarlyStopping(**config["early_stopping"])
+        model.fit(
+            train_data,
+            epochs=config["epochs"],
+            validation_data=validation_data,
+            verbose=3,
+            callbacks=[early_stopping],
+        )
+
+        return model, scaler
+    except Exception as e:
+        logging.error(f"Error training intraday model: {e}")
+        print(Fore.RED + f"Error training intraday model: {e}" + Fore.RESET)
+        return None, None
+    finally:
+        os.remove(rows_path)
+
+
+def run_intraday_forecast():
+    """Runs the intraday forecast. Prompts for a CSV of minute bars, trains on it
+    chunk by chunk and forecasts the close of the next bar."""
+    settings = get_intraday_settings()
+    path = input("Enter the path to the minute-bar CSV: ").strip()
+    if not os.path.isfile(path):
+        print(Fore.RED + f"File not found: {path}" + Fore.RESET)
+        return
+
+    logging.info(f"---- Starting an intraday run on {path} ----")
+
+    def chunk_source():
+        return read_minute_bars(path, settings["chunk_size"])
+
+    state = {}
+    model, scaler = train_intraday_model(chunk_source, state=state)
+    if model is None:
+        return
+
+    latest = state.get("pending")
+    if latest is None or latest[SELECTED_FEATURES].isna().any(axis=None):
+        print(Fore.RED + "Not enough bars to forecast the next close." + Fore.RESET)
+        return
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    artifact_path = export_inference_artifact(
+        model,
+        scaler,
+        SELECTED_FEATURES,
+        os.path.join(read_config().get("artifact_dir", "models"), f"{name}_intraday.npz"),
+    )
+    artifact = load_inference_artifact(artifact_path) if artifact_path else None
+    if artifact is None:
+        return
+    predicted = predict_future_prices_fast(artifact, latest, SELECTED_FEATURES)
+    if predicted is None:
+        return
+
+    last_close = state["tail"]["Close"].iloc[-1]
+    change_percentage = ((predicted - last_close) / last_close) * 100
+    direction = (
+        Fore.GREEN + "up" + Fore.RESET
+        if predicted > last_close
+        else Fore.RED + "down" + Fore.RESET
+    )
+    print(f"Forecasted close for the bar after {latest.index[-1]}: {predicted:.2f}")
+    print(
+        f"The price is expected to move {direction} by {abs(change_percentage):.2f}% from the last close."
+    )
+    logging.info("---- Intraday run completed successfully ----")
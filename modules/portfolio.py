@@ -0,0 +1,121 @@
+import logging
+import numpy as np
+import pandas as pd
+from scipy.linalg import cho_factor, cho_solve
+from sklearn.covariance import LedoitWolf
+from modules.calcs import (
+    calculate_sharpe_ratio,
+    calculate_sortino_ratio,
+    calculate_maximum_drawdown,
+    risk_free_rate,
+)
+
+TRADING_DAYS = 252
+
+
+def build_returns_matrix(price_data, min_coverage=0.9):
+    """Builds an aligned (dates x tickers) matrix of daily returns.
+
+    `price_data` is either a dict of per-ticker OHLCV frames (as returned by
+    `download_universe`) or a wide frame of closes. Tickers with fewer than
+    `min_coverage` of the dates are dropped. Dropping every date on which any
+    remaining ticker has a gap would leave few rows for a large universe, so
+    prices are carried over gaps (the move lands on the next quote) and the
+    returns before a ticker's first quote count as zero."""
+    if isinstance(price_data, dict):
+        closes = pd.DataFrame(
+            {ticker: frame["Close"] for ticker, frame in price_data.items()}
+        )
+    else:
+        closes = price_data
+    closes = closes.sort_index()
+
+    coverage = closes.notna().mean()
+    dropped = coverage.index[coverage < min_coverage]
+    if len(dropped):
+        logging.warning(
+            f"Dropping {len(dropped)} tickers with less than {min_coverage:.0%} coverage: {', '.join(map(str, dropped[:10]))}"
+        )
+    closes = closes.drop(columns=dropped)
+
+    returns = closes.ffill().pct_change(fill_method=None).iloc[1:]
+    return returns.dropna(how="all").fillna(0)
+
+
+def shrinkage_covariance(returns):
+    """Returns the Ledoit-Wolf shrinkage estimate of the daily covariance matrix
+    and the shrinkage intensity. The sample covariance is singular or badly
+    conditioned once the number of tickers approaches the number of days."""
+    estimator = LedoitWolf().fit(returns.to_numpy())
+    covariance = pd.DataFrame(
+        estimator.covariance_, index=returns.columns, columns=returns.columns
+    )
+    return covariance, estimator.shrinkage_
+
+
+def portfolio_returns(returns, weights):
+    """Returns the daily return series of a portfolio with fixed weights."""
+    if isinstance(weights, pd.Series):
+        weights = weights.reindex(returns.columns).fillna(0)
+    else:
+        weights = pd.Series(weights, index=returns.columns)
+    return returns @ weights
+
+
+def portfolio_metrics(returns, weights, risk_free_rate=risk_free_rate):
+    """Calculates the annualized return and volatility, the Sharpe and Sortino
+    Ratios and the Maximum Drawdown of a weighted portfolio."""
+    series = portfolio_returns(returns, weights)
+    return {
+        "annual_return": series.mean() * TRADING_DAYS,
+        "annual_volatility": series.std(ddof=1) * np.sqrt(TRADING_DAYS),
+        "sharpe_ratio": calculate_sharpe_ratio(series, risk_free_rate),
+        "sortino_ratio": calculate_sortino_ratio(series, risk_free_rate),
+        "max_drawdown": calculate_maximum_drawdown(series),
+    }
+
+
+def efficient_frontier(
+    returns, n_points=50, target_returns=None, covariance=None, risk_free_rate=risk_free_rate
+):
+    """Computes the mean-variance efficient frontier for many target returns at once.
+
+    Fully invested portfolios (weights sum to one, short positions allowed) have a
+    closed-form frontier, so a single Cholesky solve of the covariance against
+    [1, mu] yields the weights for every target as a rank-two combination.
+    Targets are annualized; by default they span from the minimum-variance
+    portfolio to the best single-asset return.
+
+    Returns a dict with the target returns, volatilities, Sharpe Ratios and the
+    (targets x tickers) weight frame, plus the minimum-variance weights."""
+    if covariance is None:
+        covariance, _ = shrinkage_covariance(returns)
+    mu = returns.mean().to_numpy() * TRADING_DAYS
+    sigma = np.asarray(covariance) * TRADING_DAYS
+    ones = np.ones(len(mu))
+
+    factor = cho_factor(sigma)
+    inv_ones, inv_mu = cho_solve(factor, np.column_stack([ones, mu])).T
+    a = ones @ inv_ones
+    b = ones @ inv_mu
+    c = mu @ inv_mu
+    d = a * c - b * b
+
+    if target_returns is None:
+        target_returns = np.linspace(b / a, mu.max(), n_points)
+    target_returns = np.asarray(target_returns, dtype=float)
+
+    # w(r) = ((c - b r) inv_ones + (a r - b) inv_mu) / d for every target r.
+    weights = (
+        np.outer(c - b * target_returns, inv_ones)
+        + np.outer(a * target_returns - b, inv_mu)
+    ) / d
+    volatilities = np.sqrt((a * target_returns**2 - 2 * b * target_returns + c) / d)
+
+    return {
+        "target_returns": target_returns,
+        "volatilities": volatilities,
+        "sharpe_ratios": (target_returns - risk_free_rate) / volatilities,
+        "weights": pd.DataFrame(weights, columns=returns.columns),
+        "min_variance_weights": pd.Series(inv_ones / a, index=returns.columns),
+    }
@@ -0,0 +1,462 @@
+from colorama import Fore
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import asyncio
+import datetime
+import logging
+import os
+import pickle
+import sqlite3
+import time
+from types import SimpleNamespace
+import keras
+import numpy as np
+import pandas as pd
+from modules.config_manager import read_config
+from modules.inference import load_inference_artifact, predict_prices
+from modules.ingestion import download_universe
+from modules.intraday import create_intraday_features
+from modules.sentiment import sentiment_pipeline
+from modules.training import (
+    SELECTED_FEATURES,
+    TimeBudget,
+    checkpoint_path,
+    export_inference_artifact,
+    get_training_budget,
+    train_model,
+)
+from modules.utils import load_rss_urls
+
+DEFAULT_SCHEDULER_SETTINGS = {
+    "watchlist": [],
+    "interval_minutes": 60,
+    "workers": 2,
+    "state_dir": "data",
+    "history_start": "2015-01-01",
+    "drift_threshold": 0.5,
+    "fine_tune_epochs": 20,
+    "fine_tune_window": 256,
+    "baseline_window": 64,
+    "sentiment_articles": 10,
+    "max_attempts": 3,
+}
+# Jobs that train models; they stop being claimed once a cycle's time budget is spent.
+TRAINING_JOBS = ("retrain", "finetune")
+
+
+class JobDeferred(Exception):
+    """Raised by a job that ran out of time budget and should run next cycle."""
+
+
+def get_scheduler_settings():
+    """Returns the scheduler settings from the config, filled in with defaults."""
+    settings = dict(DEFAULT_SCHEDULER_SETTINGS)
+    settings.update(read_config().get("scheduler", {}))
+    return settings
+
+
+# Persistent job queue
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return closing(conn)
+
+
+def open_queue(db_path):
+    """Creates the job table if needed and requeues jobs left running by a crash."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    with connect(db_path) as conn:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+        # At most one queued or running job per (kind, ticker): duplicate triggers are ignored.
+        conn.execute(
+            """CREATE UNIQUE INDEX IF NOT EXISTS active_jobs ON jobs (kind, ticker)
+            WHERE status IN ('pending', 'running')"""
+        )
+        resumed = conn.execute(
+            "UPDATE jobs SET status = 'pending', updated = ? WHERE status = 'running'",
+            (time.time(),),
+        ).rowcount
+    if resumed:
+        logging.info(f"Resuming {resumed} jobs interrupted by a previous run")
+
+
+def enqueue(db_path, kind, ticker):
+    """Queues a job unless the same job is already pending or running."""
+    now = time.time()
+    with connect(db_path) as conn:
+        added = conn.execute(
+            "INSERT OR IGNORE INTO jobs (kind, ticker, created, updated) VALUES (?, ?, ?, ?)",
+            (kind, ticker, now, now),
+        ).rowcount
+    return bool(added)
+
+
+def claim_job(db_path, skip_kinds=()):
+    """Atomically marks the oldest runnable job as running and returns it.
+    Jobs for a ticker that already has a running job wait; the universe-wide
+    "*" jobs run alone. Jobs of `skip_kinds` are left pending."""
+    with connect(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            f"""SELECT id, kind, ticker, attempts FROM jobs AS j
+            WHERE status = 'pending' AND kind NOT IN ({','.join('?' * len(skip_kinds))})
+            AND NOT EXISTS (
+                SELECT 1 FROM jobs AS r WHERE r.status = 'running'
+                AND (r.ticker = j.ticker OR r.ticker = '*' OR j.ticker = '*'))
+            ORDER BY id LIMIT 1""",
+            skip_kinds,
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+                (time.time(), row["id"]),
+            )
+        conn.execute("COMMIT")
+    return dict(row) if row is not None else None
+
+
+def finish_job(db_path, job, error=None, max_attempts=3):
+    """Marks a job done, or requeues it after a failure until `max_attempts`."""
+    if error is None:
+        status = "done"
+    elif job["attempts"] + 1 < max_attempts:
+        status = "pending"
+    else:
+        status = "failed"
+    with connect(db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE id = ?",
+            (status, error, time.time(), job["id"]),
+        )
+
+
+def defer_job(db_path, job):
+    """Puts a running job back in the queue without counting the attempt."""
+    with connect(db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = attempts - 1, updated = ? WHERE id = ?",
+            (time.time(), job["id"]),
+        )
+
+
+def count_jobs(db_path, statuses=("pending", "running"), skip_kinds=()):
+    with connect(db_path) as conn:
+        return conn.execute(
+            f"""SELECT COUNT(*) FROM jobs WHERE status IN ({','.join('?' * len(statuses))})
+            AND kind NOT IN ({','.join('?' * len(skip_kinds))})""",
+            (*statuses, *skip_kinds),
+        ).fetchone()[0]
+
+
+# Per-ticker state
+
+
+def ticker_paths(settings, ticker):
+    state_dir = settings["state_dir"]
+    artifact_dir = read_config().get("artifact_dir", "models")
+    return {
+        "bars": os.path.join(state_dir, "bars", f"{ticker}.csv"),
+        "features": os.path.join(state_dir, "features", f"{ticker}.csv"),
+        "state": os.path.join(state_dir, "state", f"{ticker}.pkl"),
+        "model": os.path.join(artifact_dir, f"{ticker}.keras"),
+        "artifact": os.path.join(artifact_dir, f"{ticker}.npz"),
+    }
+
+
+def load_state(path):
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+def save_state(path, state):
+    """Writes the state atomically so a crash never leaves a truncated file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as file:
+        pickle.dump(state, file)
+    os.replace(path + ".tmp", path)
+
+
+def append_csv(path, frame):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    frame.to_csv(path, mode="a", header=not os.path.isfile(path))
+
+
+def read_csv(path):
+    """Reads an appended CSV, keeping the last copy of rows re-appended after a crash."""
+    frame = pd.read_csv(path, index_col=0, parse_dates=True)
+    return frame[~frame.index.duplicated(keep="last")]
+
+
+# Jobs
+
+
+def ingest_job(settings, db_path, ticker):
+    """Downloads new bars for the whole watchlist in batched requests and
+    queues a feature update for every ticker with unprocessed bars."""
+    watchlist = [t.upper() for t in settings["watchlist"]]
+    states = {t: load_state(ticker_paths(settings, t)["state"]) for t in watchlist}
+    starts = [
+        (states[t]["bars_through"] + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        if "bars_through" in states[t]
+        else settings["history_start"]
+        for t in watchlist
+    ]
+    # The end date is exclusive: today's session is still forming, so only
+    # completed bars are stored and `bars_through` never points at a partial bar.
+    end = datetime.date.today().strftime("%Y-%m-%d")
+    frames, ledger = download_universe(watchlist, min(starts), end)
+
+    for t in watchlist:
+        paths = ticker_paths(settings, t)
+        state = states[t]
+        bars = frames.get(t)
+        if bars is not None and "bars_through" in state:
+            bars = bars[bars.index > state["bars_through"]]
+        if bars is not None and not bars.empty:
+            append_csv(paths["bars"], bars[["Open", "High", "Low", "Close", "Volume"]])
+            state["bars_through"] = bars.index[-1]
+            save_state(paths["state"], state)
+            logging.info(f"{t}: {len(bars)} new bars through {bars.index[-1]}")
+        elif ledger.get(t, {}).get("status") == "failed":
+            logging.warning(f"{t}: download failed ({ledger[t]['error']})")
+
+        if "bars_through" in state and state.get("features_through") != state["bars_through"]:
+            enqueue(db_path, "update", t)
+
+
+def update_job(settings, db_path, ticker):
+    """Computes features for the new bars only, carrying rolling-window state
+    from the previous run, then decides whether the model needs work."""
+    paths = ticker_paths(settings, ticker)
+    state = load_state(paths["state"])
+    if "bars_through" not in state or state.get("features_through") == state["bars_through"]:
+        return
+
+    bars = read_csv(paths["bars"])
+    if "features_through" in state:
+        bars = bars[bars.index > state["features_through"]]
+    feature_state = state.get("feature_state", {})
+    features = create_intraday_features(bars, feature_state, SELECTED_FEATURES)
+    if not features.empty:
+        append_csv(paths["features"], features)
+
+    state["feature_state"] = feature_state
+    state["features_through"] = bars.index[-1]
+    save_state(paths["state"], state)
+    logging.info(f"{ticker}: features updated with {len(features)} new rows")
+
+    artifact = (
+        load_inference_artifact(paths["artifact"])
+        if os.path.isfile(paths["artifact"])
+        else None
+    )
+    if artifact is None or "baseline_mae" not in state:
+        enqueue(db_path, "retrain", ticker)
+        return
+    if features.empty:
+        return
+
+    mae = prediction_mae(artifact, features)
+    if mae > state["baseline_mae"] * (1 + settings["drift_threshold"]):
+        logging.info(
+            f"{ticker}: error drifted ({mae:.4f} vs baseline {state['baseline_mae']:.4f})"
+        )
+        enqueue(db_path, "retrain", ticker)
+    else:
+        enqueue(db_path, "finetune", ticker)
+
+
+def prediction_mae(artifact, features):
+    """Mean absolute error of the artifact's next-close predictions on `features`."""
+    return float(
+        np.mean(np.abs(predict_prices(artifact, features) - features["Future_Close"]))
+    )
+
+
+def budget_spent(settings):
+    return settings.get("deadline") is not None and time.monotonic() >= settings["deadline"]
+
+
+def retrain_job(settings, db_path, ticker):
+    """Trains the ticker's model from scratch on the stored features, resuming
+    from its checkpoint when a previous run was cut short by the time budget.
+
+    The newest `baseline_window` rows (at most a fifth of them) are held out in
+    time order: the drift baseline must be an out-of-sample error, like the one
+    `update_job` measures on new bars."""
+    if budget_spent(settings):
+        raise JobDeferred()
+    paths = ticker_paths(settings, ticker)
+    features = read_csv(paths["features"])
+    split = len(features) - min(settings["baseline_window"], len(features) // 5)
+    if split == len(features):
+        raise RuntimeError("not enough rows to hold out a baseline")
+    train, holdout = features.iloc[:split], features.iloc[split:]
+    model, scaler = train_model(
+        train[SELECTED_FEATURES],
+        train["Future_Close"],
+        checkpoint_name=ticker,
+        deadline=settings.get("deadline"),
+    )
+    if model is None:
+        raise RuntimeError("training failed")
+    if os.path.isfile(checkpoint_path(ticker)) and os.path.isfile(paths["model"]):
+        # Stopped by the time budget: keep serving the old model, the next
+        # cycle resumes training from the checkpoint.
+        logging.info(f"{ticker}: retraining continues next cycle")
+        return
+    save_model_and_baseline(paths, ticker, model, scaler, holdout)
+
+
+def finetune_job(settings, db_path, ticker):
+    """Continues training the saved model on the most recent rows for a few
+    epochs, keeping the scaler it was trained with. Those rows are now in-sample,
+    so the drift baseline from the last retrain is kept."""
+    if budget_spent(settings):
+        raise JobDeferred()
+    paths = ticker_paths(settings, ticker)
+    if not os.path.isfile(paths["model"]):
+        enqueue(db_path, "retrain", ticker)
+        return
+
+    features = read_csv(paths["features"])
+    recent = features.iloc[-settings["fine_tune_window"] :]
+    artifact = load_inference_artifact(paths["artifact"])
+    scaler = SimpleNamespace(
+        mean_=artifact["scaler_mean"], scale_=artifact["scaler_scale"]
+    )
+    X = (recent[SELECTED_FEATURES].to_numpy() - scaler.mean_) / scaler.scale_
+    model = keras.models.load_model(paths["model"])
+    model.fit(
+        X.reshape((X.shape[0], X.shape[1], 1)),
+        recent["Future_Close"].to_numpy(),
+        epochs=settings["fine_tune_epochs"],
+        batch_size=read_config()["batch_size"],
+        verbose=0,
+        callbacks=[TimeBudget(settings.get("deadline"))],
+    )
+    save_model_and_baseline(paths, ticker, model, scaler)
+
+
+def save_model_and_baseline(paths, ticker, model, scaler, holdout=None):
+    """Saves the model and its artifact. With `holdout` rows the model never
+    saw, their error becomes the drift baseline."""
+    os.makedirs(os.path.dirname(paths["model"]) or ".", exist_ok=True)
+    model.save(paths["model"])
+    export_inference_artifact(model, scaler, SELECTED_FEATURES, paths["artifact"])
+    if holdout is None:
+        logging.info(f"{ticker}: model saved")
+        return
+    state = load_state(paths["state"])
+    state["baseline_mae"] = prediction_mae(
+        load_inference_artifact(paths["artifact"]), holdout
+    )
+    save_state(paths["state"], state)
+    logging.info(f"{ticker}: model saved, holdout MAE {state['baseline_mae']:.4f}")
+
+
+def sentiment_job(settings, db_path, ticker):
+    """Refreshes the news sentiment scan for the ticker."""
+    result = asyncio.run(
+        sentiment_pipeline(
+            ticker,
+            settings["sentiment_articles"],
+            load_rss_urls("config/rss_feeds.json"),
+            # A long-running daemon must not reuse an earlier cycle's articles.
+            use_cache=False,
+        )
+    )
+    if result is None:
+        raise RuntimeError("unknown symbol")
+    company_name, data, history = result
+    scores = [item["sentiment"] for item in data]
+    if scores:
+        logging.info(f"{ticker}: average sentiment {np.mean(scores):.2f} over {len(scores)} articles")
+
+
+JOBS = {
+    "ingest": ingest_job,
+    "update": update_job,
+    "retrain": retrain_job,
+    "finetune": finetune_job,
+    "sentiment": sentiment_job,
+}
+
+
+def run_worker(settings, db_path):
+    """Runs jobs until the queue is drained. Once the cycle's time budget is
+    spent, training jobs stay queued for the next cycle."""
+    while True:
+        skip_kinds = TRAINING_JOBS if budget_spent(settings) else ()
+        job = claim_job(db_path, skip_kinds)
+        if job is None:
+            if count_jobs(db_path, skip_kinds=skip_kinds) == 0:
+                return
+            # Remaining jobs wait for a running job on the same ticker.
+            time.sleep(1)
+            continue
+
+        logging.info(f"Running {job['kind']} job for {job['ticker']} (attempt {job['attempts'] + 1})")
+        try:
+            JOBS[job["kind"]](settings, db_path, job["ticker"])
+            finish_job(db_path, job)
+        except JobDeferred:
+            logging.info(f"{job['kind']} job for {job['ticker']} deferred to the next cycle")
+            defer_job(db_path, job)
+        except Exception as e:
+            logging.error(f"{job['kind']} job for {job['ticker']} failed: {e}")
+            finish_job(db_path, job, str(e), settings["max_attempts"])
+
+
+def run_cycle(settings, db_path):
+    """Queues one refresh of the watchlist and works the queue with a worker pool.
+    Model training stops at the training budget's `job_seconds` after the start."""
+    job_seconds = get_training_budget()["job_seconds"]
+    settings = dict(
+        settings, deadline=time.monotonic() + job_seconds if job_seconds else None
+    )
+    enqueue(db_path, "ingest", "*")
+    for ticker in settings["watchlist"]:
+        enqueue(db_path, "sentiment", ticker.upper())
+        if os.path.isfile(checkpoint_path(ticker.upper())):
+            enqueue(db_path, "retrain", ticker.upper())
+
+    with ThreadPoolExecutor(max_workers=settings["workers"]) as executor:
+        for _ in range(settings["workers"]):
+            executor.submit(run_worker, settings, db_path)
+
+
+def run_scheduler():
+    """Refreshes the watchlist on the configured cadence until interrupted.
+    Jobs interrupted by a crash are picked up again on the next start."""
+    settings = get_scheduler_settings()
+    if not settings["watchlist"]:
+        print(Fore.YELLOW + "The scheduler watchlist in the configuration is empty." + Fore.RESET)
+        return
+
+    db_path = os.path.join(settings["state_dir"], "jobs.db")
+    open_queue(db_path)
+    print(
+        f"Watching {len(settings['watchlist'])} tickers every {settings['interval_minutes']} minutes."
+    )
+    while True:
+        started = time.monotonic()
+        logging.info("---- Starting a scheduled refresh ----")
+        run_cycle(settings, db_path)
+        logging.info("---- Scheduled refresh completed ----")
+        time.sleep(max(0, settings["interval_minutes"] * 60 - (time.monotonic() - started)))
@@ -1,16 +1,26 @@
 import asyncio
+import calendar
 import logging
+import time
 import aiohttp
 import feedparser
 import nltk
+import pandas as pd
 from colorama import Fore
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 from datetime import datetime, timedelta
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.sentiment import SentimentIntensityAnalyzer
 import string
+from modules.batch_sentiment import compound_scores
 from modules.config_manager import read_config
+from modules.sentiment_store import (
+    load_sentiment_series,
+    store_articles,
+    stored_sentiments,
+)
 from modules.utils import load_rss_urls, verify_rss_feeds
 from modules.visualization import visualize_data
 
@@ -33,17 +43,20 @@ def is_cache_valid(cache_entry):
 
 
 def clean_up_cache():
-    """Remove expired entries from the cache."""
-    global sentiment_cache
+    """Remove expired entries from the caches."""
+    global sentiment_cache, news_cache
     current_time = datetime.now()
-    expired_keys = [
-        key
-        for key, value in sentiment_cache.items()
-        if current_time - value["timestamp"] > CACHE_DURATION
-    ]
-    for key in expired_keys:
-        del sentiment_cache[key]
-    logging.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+    expired_count = 0
+    for cache in (sentiment_cache, news_cache):
+        expired_keys = [
+            key
+            for key, value in cache.items()
+            if current_time - value["timestamp"] > CACHE_DURATION
+        ]
+        for key in expired_keys:
+            del cache[key]
+        expired_count += len(expired_keys)
+    logging.info(f"Cleaned up {expired_count} expired cache entries")
 
 
 async def fetch_feed(url, session):
@@ -65,19 +78,37 @@ async def fetch_feeds(rss_urls, session):
     return feeds
 
 
-def filter_relevant_articles(entries, stock_symbol, company_name):
-    """Filter relevant news articles from the entries."""
+def filter_relevant_articles(entries, stock_symbol, company_name, stored=()):
+    """Filter relevant news articles from the entries.
+    Entries whose link is in `stored` passed this filter on an earlier run, so
+    they are kept as they are (with no score) instead of being scored again."""
+    new_entries = [entry for entry in entries if entry.link not in stored]
+    texts = [entry.title + " " + entry.get("summary", "") for entry in new_entries]
+    sentiment_scores = compound_scores(texts, sia.lexicon)
+    scores = (
+        calculate_relevance_score(text, stock_symbol, company_name, sentiment_score)
+        for text, sentiment_score in zip(texts, sentiment_scores)
+    )
+
     relevant_articles = []
     for entry in entries:
-        score = calculate_relevance_score(
-            entry.title + " " + entry.get("summary", ""), stock_symbol, company_name
-        )
-        if score > 0:  # Score threshold can be adjusted
-            relevant_articles.append((entry.title, entry.link, score))
+        score = None if entry.link in stored else next(scores)
+        if score is None or score > 0:  # Score threshold can be adjusted
+            relevant_articles.append(
+                (entry.title, entry.link, score, entry_published(entry))
+            )
     return relevant_articles
 
 
-def calculate_relevance_score(text, stock_symbol, company_name):
+def entry_published(entry):
+    """Return the entry's published (or updated) time as a UTC timestamp, if any."""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    return pd.Timestamp(calendar.timegm(parsed), unit="s", tz="UTC")
+
+
+def calculate_relevance_score(text, stock_symbol, company_name, sentiment_score=None):
     """Calculate relevance score with advanced criteria including sentiment analysis."""
     words = word_tokenize(text.lower())
     stop_words = set(stopwords.words("english") + list(string.punctuation))
@@ -89,20 +120,22 @@ def calculate_relevance_score(text, stock_symbol, company_name):
         word in filtered_words
         for word in company_name.lower().split() + [stock_symbol.lower()]
     )
-    score = adjust_score_with_sentiment(text, score)
+    score = adjust_score_with_sentiment(text, score, sentiment_score)
 
     return score
 
 
-def adjust_score_with_sentiment(text, initial_score):
-    """Adjust the relevance score based on sentiment analysis."""
-    sentiment_score = sia.polarity_scores(text)["compound"]
+def adjust_score_with_sentiment(text, initial_score, sentiment_score=None):
+    """Adjust the relevance score based on sentiment analysis.
+    Pass `sentiment_score` when it was already computed in a batch."""
+    if sentiment_score is None:
+        sentiment_score = sia.polarity_scores(text)["compound"]
     if sentiment_score > 0.5 or sentiment_score < -0.5:
         return initial_score * 1.5
     return initial_score
 
 
-async def analyze_sentiment(text):
+def analyze_sentiment(text):
     """Analyze the sentiment of a given text, utilizing caching."""
     global sentiment_cache
     current_time = datetime.now()
@@ -116,9 +149,25 @@ async def analyze_sentiment(text):
     return score
 
 
+def analyze_sentiment_batch(texts):
+    """Analyze the sentiment of many texts at once, scoring only the ones that
+    are not cached with the vectorized VADER scorer."""
+    current_time = datetime.now()
+    missing = [
+        text
+        for text in dict.fromkeys(texts)
+        if not (text in sentiment_cache and is_cache_valid(sentiment_cache[text]))
+    ]
+    for text, score in zip(missing, compound_scores(missing, sia.lexicon)):
+        sentiment_cache[text] = {"score": float(score), "timestamp": current_time}
+    return [sentiment_cache[text]["score"] for text in texts]
+
+
 async def analyze_sentiment_parallel(texts):
-    """Analyze sentiment for multiple texts in parallel."""
-    return await asyncio.gather(*(analyze_sentiment(text) for text in texts))
+    """Analyze sentiment for multiple texts off the event loop. VADER scoring is
+    CPU-bound, so the whole batch is handed to an executor in one call."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, analyze_sentiment_batch, texts)
 
 
 def validate_feed_data(feed_entries):
@@ -142,25 +191,17 @@ def log_article_status(fetched_count, relevant_count):
     )
 
 
-async def fetch_news(rss_urls, stock_symbol, company_name, target_count):
-    """Fetch news articles, filter them, and log their status."""
-    global news_cache
-    cache_key = (stock_symbol, company_name, target_count)
-    if cache_key in news_cache:
-        logging.info(f"Returning cached news for {stock_symbol} - {company_name}")
-        return news_cache[cache_key]
-
+def select_news(feeds, stock_symbol, company_name, target_count, stored=()):
+    """Filter downloaded feeds down to the relevant articles and log their status.
+    Links in `stored` are already known to be relevant and are not scored again."""
     news_items = []
     fetched_count = 0
     relevant_count = 0
 
-    async with aiohttp.ClientSession() as session:
-        feeds = await fetch_feeds(rss_urls, session)
-
     for entries in feeds:
         validated_entries = validate_feed_data(entries)
         filtered_articles = filter_relevant_articles(
-            validated_entries, stock_symbol, company_name
+            validated_entries, stock_symbol, company_name, stored
         )
 
         for article in filtered_articles:
@@ -180,74 +221,213 @@ async def fetch_news(rss_urls, stock_symbol, company_name, target_count):
 
     log_article_status(fetched_count, relevant_count)
 
-    news_cache[cache_key] = news_items
+    news_cache[(stock_symbol, company_name, target_count)] = {
+        "items": news_items,
+        "timestamp": datetime.now(),
+    }
     return news_items
 
 
-def run_sentiment():
-    config = read_config()
-    verify_feeds = config.get("verify_rss_on_startup", True)
+async def fetch_news(
+    rss_urls,
+    stock_symbol,
+    company_name,
+    target_count,
+    session=None,
+    feeds=None,
+    use_cache=True,
+    stored=(),
+):
+    """Fetch news articles, filter them, and log their status.
+    Already downloaded `feeds` (or an awaitable resolving to them) can be passed in.
+    With `use_cache` False the cached articles are ignored and refreshed.
+    Entries whose link is in `stored` skip the relevance scoring."""
+    global news_cache
+    cache_key = (stock_symbol, company_name, target_count)
+    if (
+        use_cache
+        and cache_key in news_cache
+        and is_cache_valid(news_cache[cache_key])
+    ):
+        logging.info(f"Returning cached news for {stock_symbol} - {company_name}")
+        if asyncio.isfuture(feeds):
+            feeds.cancel()
+        return news_cache[cache_key]["items"]
+
+    if feeds is None:
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                feeds = await fetch_feeds(rss_urls, session)
+        else:
+            feeds = await fetch_feeds(rss_urls, session)
+    elif asyncio.isfuture(feeds):
+        feeds = await feeds
+
+    # Tokenizing and scoring every entry is CPU-bound; keep it off the event loop.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, select_news, feeds, stock_symbol, company_name, target_count, stored
+    )
 
-    file_path = "config/rss_feeds.json"
 
-    if verify_feeds:
-        logging.info("Starting RSS feed verification")
-        rss_urls = load_rss_urls(file_path)
-        asyncio.run(verify_rss_feeds(rss_urls))
-    else:
-        print(
-            Fore.YELLOW
-            + "RSS feed verification is disabled in the configuration."
-            + Fore.RESET
+def load_stock_info(stock_symbol):
+    """Fetch the ticker metadata (blocking, meant to run in an executor)."""
+    return yf.Ticker(stock_symbol).info
+
+
+def load_stock_history(stock_symbol):
+    """Fetch one month of price history (blocking, meant to run in an executor)."""
+    return yf.Ticker(stock_symbol).history(period="1mo")
+
+
+async def sentiment_pipeline(
+    stock_symbol,
+    target_count,
+    rss_urls,
+    verify_feeds=False,
+    stock_info=None,
+    use_cache=True,
+):
+    """Run the whole sentiment flow on one event loop and one HTTP session.
+
+    Feed downloads (and verification) start immediately and overlap with the
+    blocking yfinance metadata and history calls, which run in the default
+    executor. `stock_info` may be a future already fetching the metadata.
+    `use_cache` False always reads fresh news instead of the cached articles.
+    New articles are appended to the sentiment store with their published time.
+    Returns (company_name, data, history), or None for an unknown symbol."""
+    loop = asyncio.get_running_loop()
+    start_time = time.perf_counter()
+
+    async with aiohttp.ClientSession() as session:
+        feeds_task = asyncio.ensure_future(fetch_feeds(rss_urls, session))
+        verify_task = (
+            asyncio.ensure_future(verify_rss_feeds(rss_urls, session))
+            if verify_feeds
+            else None
         )
-        logging.info("RSS feed verification is disabled in the configuration.")
+        if stock_info is None:
+            stock_info = loop.run_in_executor(None, load_stock_info, stock_symbol)
+        history_task = loop.run_in_executor(None, load_stock_history, stock_symbol)
+        # Articles seen on an earlier refresh keep their stored score and skip
+        # relevance filtering; only new ones are tokenized and scored.
+        stored_task = loop.run_in_executor(None, stored_sentiments, stock_symbol)
 
-    valid_symbol = False
-    while not valid_symbol:
-        stock_symbol = input("Enter the stock ticker: ").strip().upper()
         try:
-            stock_info = yf.Ticker(stock_symbol).info
-            if "longName" in stock_info:
-                valid_symbol = True
-                company_name = stock_info.get("longName", "")
-            else:
-                print("Invalid stock symbol. Please try again.")
+            stock_info = await asyncio.wrap_future(stock_info)
         except Exception as e:
+            stock_info = {}
             print(
                 Fore.RED
-                + f"Error fetching data for symbol {stock_symbol}: {e}. Please try again."
+                + f"Error fetching data for symbol {stock_symbol}: {e}."
                 + Fore.RESET
             )
 
-    valid_article_count = False
-    while not valid_article_count:
+        if "longName" not in stock_info:
+            for task in (feeds_task, verify_task, history_task, stored_task):
+                if task is not None:
+                    task.cancel()
+            return None
+
+        company_name = stock_info.get("longName", "")
+        stored = await stored_task
+        news_items = await fetch_news(
+            rss_urls,
+            stock_symbol,
+            company_name,
+            target_count,
+            feeds=feeds_task,
+            use_cache=use_cache,
+            stored=stored,
+        )
+        new_items = [article for article in news_items if article[1] not in stored]
+        new_sentiments = await analyze_sentiment_parallel(
+            [article[0] for article in new_items]
+        )
+        stored.update(
+            (article[1], sentiment)
+            for article, sentiment in zip(new_items, new_sentiments)
+        )
+        sentiments = [stored[article[1]] for article in news_items]
+        if verify_task is not None:
+            await verify_task
+        history = await history_task
+
+    data = [
+        {
+            "title": article[0],
+            "sentiment": sentiment,
+            "source": article[1],
+            "published": article[3],
+        }
+        for article, sentiment in zip(news_items, sentiments)
+    ]
+    await loop.run_in_executor(None, store_articles, stock_symbol, data)
+    logging.info(
+        f"Sentiment pipeline for {stock_symbol} completed in {time.perf_counter() - start_time:.2f}s"
+    )
+    return company_name, data, history
+
+
+def prompt_article_count():
+    """Prompt until the user enters a positive number of articles."""
+    while True:
         try:
             target_article_count_input = input(
                 "Enter desired number of relevant articles: "
             ).strip()
             target_article_count = int(target_article_count_input)
             if target_article_count > 0:
-                valid_article_count = True
-            else:
-                print("Please enter a positive integer for the number of articles.")
+                return target_article_count
+            print("Please enter a positive integer for the number of articles.")
         except ValueError:
             print(
                 "Invalid input. Please enter a valid positive integer for the number of articles."
             )
 
-    stock_info = yf.Ticker(stock_symbol).info
-    company_name = stock_info.get("longName", "")
+
+def run_sentiment():
+    config = read_config()
+    verify_feeds = config.get("verify_rss_on_startup", True)
+
+    file_path = "config/rss_feeds.json"
     rss_urls = load_rss_urls(file_path)
-    news_items = asyncio.run(
-        fetch_news(rss_urls, stock_symbol, company_name, target_article_count)
-    )
-    sentiments = asyncio.run(
-        analyze_sentiment_parallel([article[0] for article in news_items])
-    )
 
-    data = [
-        {"title": article[0], "sentiment": sentiment, "source": article[1]}
-        for article, sentiment in zip(news_items, sentiments)
-    ]
-    stock_data = yf.Ticker(stock_symbol)
-    visualize_data(stock_symbol, data, stock_data)
+    if verify_feeds:
+        logging.info("Starting RSS feed verification")
+    else:
+        print(
+            Fore.YELLOW
+            + "RSS feed verification is disabled in the configuration."
+            + Fore.RESET
+        )
+        logging.info("RSS feed verification is disabled in the configuration.")
+
+    target_article_count = None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        while True:
+            stock_symbol = input("Enter the stock ticker: ").strip().upper()
+            # Start the metadata lookup while the user is still typing the article count.
+            stock_info = executor.submit(load_stock_info, stock_symbol)
+            if target_article_count is None:
+                target_article_count = prompt_article_count()
+
+            result = asyncio.run(
+                sentiment_pipeline(
+                    stock_symbol,
+                    target_article_count,
+                    rss_urls,
+                    verify_feeds=verify_feeds,
+                    stock_info=stock_info,
+                )
+            )
+            if result is not None:
+                break
+            # An unknown symbol cancels the feed verification, so it runs again
+            # on the next attempt; the article count is kept.
+            print("Invalid stock symbol. Please try again.")
+
+    company_name, data, history = result
+    visualize_data(
+        stock_symbol, data, history, load_sentiment_series(stock_symbol, "D")
+    )
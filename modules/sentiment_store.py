@@ -0,0 +1,203 @@
+import glob
+import logging
+import os
+import time
+import pandas as pd
+from modules.config_manager import read_config
+
+# Append-only columnar store. Every refresh writes new Parquet part files and
+# never rewrites old ones:
+#   <store_dir>/<TICKER>/articles/part-*.parquet  one row per article
+#   <store_dir>/<TICKER>/D/part-*.parquet         daily sentiment sums and counts
+#   <store_dir>/<TICKER>/h/part-*.parquet         hourly sentiment sums and counts
+# Storing sums and counts lets the parts of a period be combined by addition.
+#
+# Once a directory holds COMPACT_AFTER_PARTS parts they are merged into a
+# base-<stamp>.parquet file covering every part up to that stamp. Readers use
+# the newest base plus the parts written after it, so parts left behind by a
+# crash during compaction are never counted twice.
+
+FREQUENCIES = ("D", "h")
+COMPACT_AFTER_PARTS = 24
+
+
+def get_store_dir():
+    return read_config().get("sentiment_store_dir", os.path.join("data", "sentiment"))
+
+
+def file_stamp(path):
+    """Returns the nanosecond stamp in a part-<stamp> or base-<stamp> file name."""
+    return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+
+def live_files(directory):
+    """Returns the newest base file (or None) and the part files written after
+    it, oldest first."""
+    bases = sorted(glob.glob(os.path.join(directory, "base-*.parquet")), key=file_stamp)
+    base = bases[-1] if bases else None
+    covered = file_stamp(base) if base else -1
+    parts = sorted(
+        (
+            part
+            for part in glob.glob(os.path.join(directory, "part-*.parquet"))
+            if file_stamp(part) > covered
+        ),
+        key=file_stamp,
+    )
+    return base, parts
+
+
+def read_parts(directory, columns=None):
+    """Reads and concatenates the live files of a store directory."""
+    base, parts = live_files(directory)
+    files = ([base] if base else []) + parts
+    if not files:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(
+        [pd.read_parquet(path, columns=columns) for path in files], ignore_index=True
+    )
+
+
+def write_file(path, frame):
+    frame.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def write_part(directory, frame):
+    os.makedirs(directory, exist_ok=True)
+    write_file(os.path.join(directory, f"part-{time.time_ns()}.parquet"), frame)
+
+
+def compact_parts(directory, combine):
+    """Merges the live files of a directory into one base file once it holds
+    COMPACT_AFTER_PARTS parts, so reads do not slow down as refreshes pile up.
+    `combine` reduces the concatenated rows (e.g. sums the aggregates per period)."""
+    base, parts = live_files(directory)
+    if len(parts) < COMPACT_AFTER_PARTS:
+        return
+    merged = combine(read_parts(directory))
+    covered = file_stamp(parts[-1])
+    base = os.path.join(directory, f"base-{covered}.parquet")
+    write_file(base, merged)
+
+    # The new base is live: the files it covers are ignored by readers and can go.
+    for path in glob.glob(os.path.join(directory, "*-*.parquet")):
+        if path != base and file_stamp(path) <= covered:
+            os.remove(path)
+    logging.info(f"Compacted {len(parts)} parts in {directory}")
+
+
+def load_articles(ticker, store_dir=None):
+    """Returns every stored article for the ticker."""
+    store_dir = store_dir or get_store_dir()
+    return read_parts(
+        os.path.join(store_dir, ticker.upper(), "articles"),
+        ["published", "title", "link", "sentiment"],
+    )
+
+
+def stored_sentiments(ticker, store_dir=None):
+    """Returns a link -> sentiment dict of the articles already stored."""
+    articles = load_articles(ticker, store_dir)
+    return dict(zip(articles["link"], articles["sentiment"]))
+
+
+def store_articles(ticker, articles, store_dir=None):
+    """Appends the articles not stored yet and their daily and hourly aggregates.
+
+    `articles` holds dicts with title, source (link), sentiment and published
+    (a UTC timestamp or None). Articles without a published time are kept but
+    left out of the time series. Returns the number of new articles."""
+    store_dir = store_dir or get_store_dir()
+    ticker_dir = os.path.join(store_dir, ticker.upper())
+    seen = set(stored_sentiments(ticker, store_dir))
+
+    new = pd.DataFrame(
+        [
+            {
+                "published": article.get("published"),
+                "title": article["title"],
+                "link": article["source"],
+                "sentiment": float(article["sentiment"]),
+            }
+            for article in articles
+            if article["source"] not in seen
+        ],
+        columns=["published", "title", "link", "sentiment"],
+    ).drop_duplicates("link")
+    if new.empty:
+        return 0
+
+    new["published"] = pd.to_datetime(new["published"], utc=True)
+    write_part(os.path.join(ticker_dir, "articles"), new)
+    compact_parts(
+        os.path.join(ticker_dir, "articles"),
+        lambda frame: frame.drop_duplicates("link"),
+    )
+
+    dated = new.dropna(subset=["published"])
+    for freq in FREQUENCIES:
+        if dated.empty:
+            break
+        periods = dated.groupby(dated["published"].dt.floor(freq))["sentiment"]
+        aggregate = pd.DataFrame(
+            {"sentiment_sum": periods.sum(), "articles": periods.count()}
+        ).rename_axis("period")
+        write_part(os.path.join(ticker_dir, freq), aggregate.reset_index())
+        compact_parts(
+            os.path.join(ticker_dir, freq),
+            lambda frame: frame.groupby("period", as_index=False)[
+                ["sentiment_sum", "articles"]
+            ].sum(),
+        )
+
+    logging.info(f"Stored {len(new)} new articles for {ticker.upper()}")
+    return len(new)
+
+
+def load_sentiment_series(ticker, freq="D", store_dir=None):
+    """Returns the ticker's sentiment series at `freq` ("D" or "h"): the mean
+    sentiment and the article count per period, indexed by UTC period start."""
+    store_dir = store_dir or get_store_dir()
+    parts = read_parts(
+        os.path.join(store_dir, ticker.upper(), freq),
+        ["period", "sentiment_sum", "articles"],
+    )
+    if parts.empty:
+        return pd.DataFrame(
+            columns=["Sentiment", "Articles"],
+            index=pd.DatetimeIndex([], tz="UTC", name="period"),
+        )
+    totals = parts.groupby("period")[["sentiment_sum", "articles"]].sum()
+    return pd.DataFrame(
+        {
+            "Sentiment": totals["sentiment_sum"] / totals["articles"],
+            "Articles": totals["articles"],
+        }
+    ).sort_index()
+
+
+def join_sentiment(stock_data, ticker, freq="D", tolerance="3D", store_dir=None):
+    """Adds Sentiment and Sentiment_Articles columns to OHLCV bars with an as-of
+    merge: each bar gets the latest period that started at or before it, within
+    `tolerance`. Bars without recent news get a neutral 0. The bar timestamps
+    come from the "Date" column if present, otherwise from the index."""
+    series = load_sentiment_series(ticker, freq, store_dir).rename(
+        columns={"Articles": "Sentiment_Articles"}
+    )
+    dates = stock_data["Date"] if "Date" in stock_data.columns else stock_data.index
+    dates = pd.DatetimeIndex(dates)
+    dates = dates.tz_convert("UTC") if dates.tz is not None else dates.tz_localize("UTC")
+
+    left = pd.DataFrame({"bar_time": dates, "position": range(len(dates))}).sort_values(
+        "bar_time"
+    )
+    right = series.reset_index().rename(columns={"period": "bar_time"})
+    right["bar_time"] = right["bar_time"].astype(left["bar_time"].dtype)
+    merged = pd.merge_asof(
+        left, right, on="bar_time", tolerance=pd.Timedelta(tolerance)
+    ).sort_values("position")
+
+    stock_data["Sentiment"] = merged["Sentiment"].fillna(0).to_numpy()
+    stock_data["Sentiment_Articles"] = merged["Sentiment_Articles"].fillna(0).to_numpy()
+    return stock_data
@@ -0,0 +1,89 @@
+from colorama import Fore
+import datetime
+import logging
+import os
+from modules.config_manager import read_config
+from modules.features import compute_features, feature_lookback
+from modules.inference import load_inference_artifact, predict_future_prices_fast
+from modules.ingestion import download_universe
+from modules.sentiment_store import join_sentiment
+
+# Serves forecasts from artifacts exported by a previous forecast run. Like
+# modules.inference, this module must not import Keras/TensorFlow, directly or
+# through modules.training.
+
+# Calendar days of history downloaded to warm up features such as the EMAs
+# that depend on the whole history.
+HISTORY_DAYS = 730
+
+
+def artifact_path(ticker):
+    return os.path.join(read_config().get("artifact_dir", "models"), f"{ticker}.npz")
+
+
+def serve_forecast(ticker):
+    """Forecasts the next close of `ticker` from its exported artifact, without
+    training or loading Keras. Returns (last_close, forecast), or None."""
+    ticker = ticker.strip().upper()
+    path = artifact_path(ticker)
+    if not os.path.isfile(path):
+        print(
+            Fore.RED
+            + f"No exported model for {ticker} at {path}. Run a forecast first."
+            + Fore.RESET
+        )
+        return None
+    artifact = load_inference_artifact(path)
+    if artifact is None:
+        return None
+
+    selected_features = artifact["selected_features"]
+    lookback = feature_lookback(
+        [name for name in selected_features if name != "Sentiment"]
+    )
+    days = max(HISTORY_DAYS, 2 * (lookback or 0))
+    end = datetime.date.today() + datetime.timedelta(days=1)
+    frames, ledger = download_universe(
+        [ticker],
+        (end - datetime.timedelta(days=days)).strftime("%Y-%m-%d"),
+        end.strftime("%Y-%m-%d"),
+    )
+    if ticker not in frames:
+        entry = ledger.get(ticker, {})
+        reason = entry.get("error") or "unknown ticker"
+        print(Fore.RED + f"Could not download {ticker}: {reason}" + Fore.RESET)
+        return None
+
+    stock_data = frames[ticker]
+    if "Sentiment" in selected_features:
+        stock_data = join_sentiment(stock_data, ticker)
+    latest = compute_features(stock_data, selected_features).iloc[[-1]]
+    if latest.isna().any(axis=None):
+        print(Fore.RED + f"Not enough history to forecast {ticker}." + Fore.RESET)
+        return None
+
+    forecast = predict_future_prices_fast(artifact, latest, selected_features)
+    if forecast is None:
+        return None
+    last_close = stock_data["Close"].iloc[-1]
+    logging.info(f"Served {ticker} forecast {forecast:.2f} from {path}")
+    return last_close, forecast
+
+
+def run_serve(tickers):
+    """Prints the next-close forecast of every ticker from its exported model."""
+    for ticker in tickers:
+        result = serve_forecast(ticker)
+        if result is None:
+            continue
+        last_close, forecast = result
+        change_percentage = ((forecast - last_close) / last_close) * 100
+        direction = (
+            Fore.GREEN + "up" + Fore.RESET
+            if forecast > last_close
+            else Fore.RED + "down" + Fore.RESET
+        )
+        print(
+            f"{ticker.strip().upper()}: forecasted close {forecast:.2f}, {direction} "
+            f"{abs(change_percentage):.2f}% from the last close {last_close:.2f}"
+        )
@@ -0,0 +1,158 @@
+from colorama import Fore
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from modules.config_manager import read_config
+
+# Kept free of yfinance/Keras imports: worker processes import this module.
+# Workers are always spawned (forking a process that has loaded TensorFlow is
+# unsafe), and a spawned worker also re-imports the parent's __main__ module, so
+# entry points that run simulations (main.py) import Keras-backed modules lazily.
+
+DEFAULT_SIMULATION_SETTINGS = {
+    "paths": 100000,
+    "horizons": [1, 5, 21, 252],
+    "method": "gbm",
+    "block_size": 5,
+    "chunk_size": 10000,
+    "workers": None,
+    "confidence": 0.95,
+    "seed": None,
+}
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def get_simulation_settings():
+    """Returns the simulation settings from the config, filled in with defaults."""
+    settings = dict(DEFAULT_SIMULATION_SETTINGS)
+    settings.update(read_config().get("simulation", {}))
+    return settings
+
+
+def simulate_chunk(method, seed, n_paths, horizons, log_returns, block_size):
+    """Simulates one chunk of paths and returns the gross return at each horizon,
+    shaped (n_paths, len(horizons)). Only one chunk of paths is held in memory."""
+    rng = np.random.default_rng(seed)
+    steps = max(horizons)
+
+    if method == "gbm":
+        drift = log_returns.mean()
+        volatility = log_returns.std(ddof=1)
+        increments = rng.standard_normal((n_paths, steps), dtype=np.float32)
+        increments *= volatility
+        increments += drift
+    elif method == "bootstrap":
+        # Resample contiguous blocks of history to keep short-range autocorrelation.
+        n_blocks = -(-steps // block_size)
+        starts = rng.integers(0, len(log_returns) - block_size + 1, (n_paths, n_blocks))
+        index = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)
+        increments = log_returns.astype(np.float32)[index[:, :steps]]
+    else:
+        raise ValueError(f"Unknown simulation method: {method}")
+
+    np.cumsum(increments, axis=1, out=increments)
+    return np.exp(increments[:, np.asarray(horizons) - 1])
+
+
+def simulate_paths(
+    daily_returns,
+    n_paths,
+    horizons,
+    method="gbm",
+    block_size=5,
+    chunk_size=10000,
+    workers=None,
+    seed=None,
+):
+    """Simulates `n_paths` price paths from a series of daily simple returns.
+
+    "gbm" draws normal log returns with the historical drift and volatility;
+    "bootstrap" resamples blocks of the historical log returns. Paths are
+    generated in fixed-size chunks, spread over a process pool, each chunk with
+    its own independent RNG stream spawned from `seed`. Returns the gross return
+    at every horizon, shaped (n_paths, len(horizons))."""
+    log_returns = np.log1p(np.asarray(daily_returns, dtype=np.float64))
+    log_returns = log_returns[np.isfinite(log_returns)]
+    if method == "bootstrap" and len(log_returns) < block_size:
+        raise ValueError("Not enough returns for the block bootstrap")
+
+    horizons = sorted(set(int(h) for h in horizons))
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [
+        (method, s, size, horizons, log_returns, block_size)
+        for s, size in zip(seeds, sizes)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(args) == 1:
+        chunks = [simulate_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(args)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            chunks = list(executor.map(simulate_chunk, *zip(*args)))
+
+    return horizons, np.concatenate(chunks)
+
+
+def risk_report(gross_returns, horizons, last_price, confidence=0.95):
+    """Summarizes simulated gross returns per horizon: Value at Risk and
+    Conditional VaR (as positive loss fractions) and price percentile bands."""
+    rows = []
+    for i, horizon in enumerate(horizons):
+        returns = gross_returns[:, i].astype(np.float64) - 1
+        cutoff = np.quantile(returns, 1 - confidence)
+        row = {
+            "Horizon": horizon,
+            "VaR": -cutoff,
+            "CVaR": -returns[returns <= cutoff].mean(),
+        }
+        for p, value in zip(
+            PERCENTILES, np.percentile(gross_returns[:, i], PERCENTILES)
+        ):
+            row[f"P{p}"] = last_price * value
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("Horizon")
+
+
+def run_simulation(daily_returns, last_price, settings=None):
+    """Runs the configured Monte Carlo simulation and prints VaR, CVaR and
+    price bands for each horizon."""
+    settings = settings or get_simulation_settings()
+    try:
+        horizons, gross_returns = simulate_paths(
+            daily_returns,
+            settings["paths"],
+            settings["horizons"],
+            method=settings["method"],
+            block_size=settings["block_size"],
+            chunk_size=settings["chunk_size"],
+            workers=settings["workers"],
+            seed=settings["seed"],
+        )
+        report = risk_report(
+            gross_returns, horizons, last_price, settings["confidence"]
+        )
+    except Exception as e:
+        logging.error(f"Error running Monte Carlo simulation: {e}")
+        print(Fore.RED + f"Error running Monte Carlo simulation: {e}" + Fore.RESET)
+        return None
+
+    print(
+        f"Monte Carlo ({settings['paths']:,} {settings['method']} paths, "
+        f"{settings['confidence']:.0%} confidence):"
+    )
+    for horizon, row in report.iterrows():
+        print(
+            f"  {horizon:>3} days: VaR {row['VaR']:.2%}, CVaR {row['CVaR']:.2%}, "
+            f"price band {row['P5']:.2f} - {row['P95']:.2f} (median {row['P50']:.2f})"
+        )
+    logging.info(f"Monte Carlo report:\n{report}")
+    return report
@@ -1,29 +1,69 @@
 from colorama import Fore
-from keras.callbacks import EarlyStopping
+from keras.callbacks import Callback, EarlyStopping
 from keras.layers import LSTM, Dense
 from keras.models import Sequential
 import logging
 import json
-from modules.calcs import calculate_rsi
+import numpy as np
+import os
+import time
 from modules.config_manager import ensure_config_exists, read_config
+from modules.features import compute_features, register_feature
+from modules.ingestion import download_universe
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
-import yfinance as yf
 
 # Global Variables
 days_ahead = 1
 training = True
+SELECTED_FEATURES = [
+    "Open",
+    "High",
+    "Low",
+    "Volume",
+    "SMA_50",
+    "SMA_200",
+    "MACD",
+    "RSI",
+]
+LEGACY_FEATURES = [
+    "SMA_50",
+    "SMA_200",
+    "EMA_12",
+    "EMA_26",
+    "MACD",
+    "RSI",
+    "Daily_Return",
+    *(f"Close_Lag_{lag}" for lag in range(1, 6)),
+    *(f"Daily_Return_Lag_{lag}" for lag in range(1, 6)),
+    "Rolling_Mean_Close",
+    "Rolling_Std_Close",
+]
+DEFAULT_TRAINING_BUDGET = {
+    "ticker_seconds": None,
+    "job_seconds": None,
+    "checkpoint_dir": "checkpoints",
+    "checkpoint_interval": 10,
+}
+
+
+@register_feature("Future_Close", ["Close"])
+def future_close(close):
+    return close.shift(-days_ahead)
 
 
 def get_stock_data(ticker, start_date, end_date):
     """Returns stock data for a given ticker symbol and date range."""
     try:
-        stock_data = yf.download(ticker, start=start_date, end=end_date)
-        return stock_data
-    except yf.TickerError:
-        logging.warning(f"Unknown ticker: {ticker}")
-        print(Fore.RED + f"Unknown ticker: {ticker}" + Fore.RESET)
-        return None
+        frames, ledger = download_universe([ticker], start_date, end_date)
+        entry = ledger.get(ticker.strip().upper())
+        if entry is None or entry["status"] == "empty":
+            logging.warning(f"Unknown ticker: {ticker}")
+            print(Fore.RED + f"Unknown ticker: {ticker}" + Fore.RESET)
+            return None
+        if entry["status"] == "failed":
+            raise RuntimeError(entry["error"])
+        return frames[ticker.strip().upper()]
     except Exception as e:
         logging.error(f"Error fetching stock data: {e}")
         print(Fore.RED + f"Error fetching stock data: {e}" + Fore.RESET)
@@ -41,28 +81,15 @@ def preprocess_data(stock_data):
         return None
 
 
-def create_features(stock_data):
-    """Creates features for the stock data."""
+def create_features(stock_data, selected_features=None):
+    """Creates features for the stock data. Only `selected_features` (plus the
+    Future_Close target) and their dependencies are computed; without a selection
+    every legacy feature is built."""
     try:
-        stock_data["SMA_50"] = stock_data["Close"].rolling(window=50).mean()
-        stock_data["SMA_200"] = stock_data["Close"].rolling(window=200).mean()
-        stock_data["EMA_12"] = stock_data["Close"].ewm(span=12, adjust=False).mean()
-        stock_data["EMA_26"] = stock_data["Close"].ewm(span=26, adjust=False).mean()
-        stock_data["MACD"] = stock_data["EMA_12"] - stock_data["EMA_26"]
-        stock_data["RSI"] = calculate_rsi(stock_data["Close"], window=14)
-
-        stock_data["Daily_Return"] = stock_data["Close"].pct_change()
-
-        for lag in range(1, 6):
-            stock_data[f"Close_Lag_{lag}"] = stock_data["Close"].shift(lag)
-            stock_data[f"Daily_Return_Lag_{lag}"] = stock_data["Daily_Return"].shift(
-                lag
-            )
-
-        stock_data["Rolling_Mean_Close"] = stock_data["Close"].rolling(window=10).mean()
-        stock_data["Rolling_Std_Close"] = stock_data["Close"].rolling(window=10).std()
-
-        stock_data["Future_Close"] = stock_data["Close"].shift(-days_ahead)
+        names = list(selected_features or LEGACY_FEATURES) + ["Future_Close"]
+        features = compute_features(stock_data, names)
+        for name in names:
+            stock_data[name] = features[name]
         stock_data = stock_data.dropna()
 
         return stock_data
@@ -72,7 +99,243 @@ def create_features(stock_data):
         return None
 
 
-def train_model(features, target):
+def build_model(n_features, config):
+    """Builds and compiles the LSTM that reads the feature vector as a sequence."""
+    model = Sequential()
+    model.add(LSTM(units=250, activation="relu", input_shape=(n_features, 1)))
+    model.add(Dense(units=days_ahead))
+
+    model.compile(optimizer=config["optimizer"], loss=config["loss"])
+    return model
+
+
+def get_training_budget():
+    """Returns the training budget settings from the config, filled in with defaults."""
+    budget = dict(DEFAULT_TRAINING_BUDGET)
+    budget.update(read_config().get("training_budget", {}))
+    return budget
+
+
+def checkpoint_path(name, budget=None):
+    budget = budget or get_training_budget()
+    return os.path.join(budget["checkpoint_dir"], f"{name}.npz")
+
+
+def save_checkpoint(path, weights, state, signature=None):
+    """Writes the weights, the training `state` (epoch, best, best_epoch) and the
+    data `signature` atomically, so a kill mid-write never leaves a truncated
+    checkpoint."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    arrays = {f"weight_{i}": w for i, w in enumerate(weights)}
+    signature = {f"data_{key}": value for key, value in (signature or {}).items()}
+    np.savez(path + ".tmp.npz", **state, **signature, **arrays)
+    os.replace(path + ".tmp.npz", path)
+
+
+def load_checkpoint(path, model, signature=None):
+    """Loads a checkpoint into `model` and returns its state (epoch, best,
+    best_epoch). Returns None when there is no checkpoint, or it was written
+    for a model of another shape or for other training data: `signature`
+    (e.g. the scaler parameters and the row count) must match the saved one."""
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as data:
+        n_weights = sum(key.startswith("weight_") for key in data.files)
+        weights = [data[f"weight_{i}"] for i in range(n_weights)]
+        saved_signature = {
+            key[len("data_") :]: data[key]
+            for key in data.files
+            if key.startswith("data_")
+        }
+        state = {
+            "epoch": int(data["epoch"]),
+            "best": float(data["best"]),
+            "best_epoch": int(data["best_epoch"]),
+        }
+    if [w.shape for w in weights] != [w.shape for w in model.get_weights()]:
+        logging.warning(f"Ignoring checkpoint {path}: it does not match the model")
+        return None
+    signature = signature or {}
+    if saved_signature.keys() != signature.keys() or any(
+        not np.array_equal(saved_signature[key], value)
+        for key, value in signature.items()
+    ):
+        logging.warning(f"Ignoring checkpoint {path}: the training data has changed")
+        return None
+    model.set_weights(weights)
+    return state
+
+
+class ResumableEarlyStopping(EarlyStopping):
+    """EarlyStopping that continues from a checkpoint's best value and epoch
+    instead of restarting its patience on every resumed run."""
+
+    def __init__(self, resumed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.resumed = resumed
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        if self.resumed:
+            self.best = self.resumed["best"]
+            self.best_epoch = self.resumed["best_epoch"]
+            self.wait = self.resumed["epoch"] - 1 - self.resumed["best_epoch"]
+            if self.restore_best_weights:
+                # The model starts from the checkpointed best weights.
+                self.best_weights = self.model.get_weights()
+
+
+class TimeBudget(Callback):
+    """Stops training after the batch during which `deadline` (a time.monotonic()
+    value) passes."""
+
+    def __init__(self, deadline):
+        super().__init__()
+        self.deadline = deadline
+        self.exhausted = False
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.exhausted = True
+            self.model.stop_training = True
+
+
+class BestWeightsCheckpoint(Callback):
+    """Keeps the weights with the lowest `monitor` value and writes them to
+    `path`, with the data `signature`, every `interval` epochs."""
+
+    def __init__(self, monitor, path=None, interval=10, resumed=None, signature=None):
+        super().__init__()
+        self.monitor = monitor
+        self.path = path
+        self.interval = interval
+        self.signature = signature
+        resumed = resumed or {"epoch": 0, "best": np.inf, "best_epoch": -1}
+        self.epoch = resumed["epoch"]
+        self.best = resumed["best"]
+        self.best_epoch = resumed["best_epoch"]
+        self.best_weights = None
+
+    def on_train_begin(self, logs=None):
+        if self.best < np.inf:
+            # Resumed from a checkpoint: the model starts from the best weights.
+            self.best_weights = self.model.get_weights()
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is not None and value < self.best:
+            self.best, self.best_epoch = value, epoch
+            self.best_weights = self.model.get_weights()
+        self.epoch = epoch + 1
+        if self.path and self.interval and self.epoch % self.interval == 0:
+            self.save()
+
+    def save(self):
+        if self.path and self.best_weights is not None:
+            state = {
+                "epoch": self.epoch,
+                "best": self.best,
+                "best_epoch": self.best_epoch,
+            }
+            save_checkpoint(self.path, self.best_weights, state, self.signature)
+
+
+class ThroughputLogger(Callback):
+    """Logs the duration and samples per second of every epoch."""
+
+    def __init__(self, n_samples, name):
+        super().__init__()
+        self.n_samples = n_samples
+        self.name = name
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self.epoch_start
+        logging.info(
+            f"{self.name}: epoch {epoch + 1} took {elapsed:.2f}s "
+            f"({self.n_samples / max(elapsed, 1e-9):,.0f} samples/s)"
+        )
+
+
+def fit_with_budget(
+    model,
+    x,
+    y,
+    validation_data,
+    batch_size,
+    checkpoint_name=None,
+    deadline=None,
+    signature=None,
+):
+    """Fits `model` with early stopping inside the configured time budget.
+
+    Training stops when `ticker_seconds` have elapsed or at `deadline` (a
+    time.monotonic() value, e.g. the end of a batch job), whichever comes first,
+    and the best weights are restored. With a `checkpoint_name`, the best
+    weights are checkpointed every `checkpoint_interval` epochs; a run that was
+    stopped by the budget or killed resumes from its checkpoint, with its
+    early stopping state, which is removed once training finishes. The
+    checkpoint is only reused while `signature` (arrays describing the training
+    data, such as the scaler parameters and the row count) is unchanged.
+    Returns True if the budget stopped training."""
+    config = read_config()
+    budget = get_training_budget()
+    if budget["ticker_seconds"]:
+        own_deadline = time.monotonic() + budget["ticker_seconds"]
+        deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+
+    path = checkpoint_path(checkpoint_name, budget) if checkpoint_name else None
+    resumed = load_checkpoint(path, model, signature) if path else None
+    initial_epoch = resumed["epoch"] if resumed else 0
+    if resumed:
+        logging.info(f"{checkpoint_name}: resuming training from epoch {initial_epoch}")
+
+    name = checkpoint_name or "model"
+    n_samples = len(x[0]) if isinstance(x, list) else len(x)
+    time_budget = TimeBudget(deadline)
+    checkpoint = BestWeightsCheckpoint(
+        config["early_stopping"]["monitor"],
+        path,
+        budget["checkpoint_interval"],
+        resumed,
+        signature,
+    )
+    model.fit(
+        x,
+        y,
+        epochs=config["epochs"],
+        initial_epoch=initial_epoch,
+        batch_size=batch_size,
+        validation_data=validation_data,
+        verbose=3,
+        callbacks=[
+            ResumableEarlyStopping(resumed, **config["early_stopping"]),
+            time_budget,
+            checkpoint,
+            ThroughputLogger(n_samples, name),
+        ],
+    )
+
+    if time_budget.exhausted:
+        checkpoint.save()
+        logging.warning(
+            f"{name}: training stopped by the time budget "
+            f"after epoch {checkpoint.epoch}"
+        )
+    elif path and os.path.isfile(path):
+        os.remove(path)
+    if checkpoint.best_weights is not None and (
+        time_budget.exhausted or config["early_stopping"].get("restore_best_weights")
+    ):
+        model.set_weights(checkpoint.best_weights)
+    return time_budget.exhausted
+
+
+def train_model(features, target, checkpoint_name=None, deadline=None):
+    """Trains the LSTM on one ticker. `checkpoint_name` and `deadline` are
+    passed to `fit_with_budget`."""
     config = read_config()
 
     try:
@@ -95,13 +358,7 @@ def train_model(features, target):
         X_train_scaled = scaler.fit_transform(X_train)
         X_test_scaled = scaler.transform(X_test)
 
-        model = Sequential()
-        model.add(
-            LSTM(units=250, activation="relu", input_shape=(X_train_scaled.shape[1], 1))
-        )
-        model.add(Dense(units=days_ahead))
-
-        model.compile(optimizer=config["optimizer"], loss=config["loss"])
+        model = build_model(X_train_scaled.shape[1], config)
 
         X_train_reshaped = X_train_scaled.reshape(
             (X_train_scaled.shape[0], X_train_scaled.shape[1], 1)
@@ -110,16 +367,15 @@ def train_model(features, target):
             (X_test_scaled.shape[0], X_test_scaled.shape[1], 1)
         )
 
-        early_stopping = EarlyStopping(**config["early_stopping"])
-
-        model.fit(
+        fit_with_budget(
+            model,
             X_train_reshaped,
             y_train,
-            epochs=config["epochs"],
-            batch_size=config["batch_size"],
-            validation_data=(X_test_reshaped, y_test),
-            verbose=3,
-            callbacks=[early_stopping],
+            (X_test_reshaped, y_test),
+            config["batch_size"],
+            checkpoint_name,
+            deadline,
+            {"mean": scaler.mean_, "scale": scaler.scale_, "rows": len(features)},
         )
 
         return model, scaler
@@ -129,3 +385,36 @@ def train_model(features, target):
         return None, None
     finally:
         training = False
+
+
+def export_inference_artifact(model, scaler, selected_features, path):
+    """Exports the trained LSTM weights and scaler parameters to a compact
+    .npz file that `modules.inference` can serve without importing Keras."""
+    try:
+        lstm_layer, dense_layer = model.layers[0], model.layers[-1]
+        lstm_config = lstm_layer.get_config()
+        lstm_kernel, lstm_recurrent_kernel, lstm_bias = lstm_layer.get_weights()
+        dense_kernel, dense_bias = dense_layer.get_weights()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(
+            path,
+            lstm_kernel=lstm_kernel,
+            lstm_recurrent_kernel=lstm_recurrent_kernel,
+            lstm_bias=lstm_bias,
+            dense_kernel=dense_kernel,
+            dense_bias=dense_bias,
+            activation=np.array(lstm_config["activation"]),
+            recurrent_activation=np.array(lstm_config["recurrent_activation"]),
+            scaler_mean=scaler.mean_,
+            scaler_scale=scaler.scale_,
+            selected_features=np.array(selected_features),
+        )
+        logging.info(f"Exported inference artifact to {path}")
+        return path
+    except Exception as e:
+        logging.error(f"Error exporting inference artifact: {e}")
+        print(Fore.RED + f"Error exporting inference artifact: {e}" + Fore.RESET)
+        return None
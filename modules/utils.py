@@ -23,11 +23,14 @@ async def verify_rss_feed(url, session):
         return url, f"Error: {e}"
 
 
-async def verify_rss_feeds(rss_urls):
-    """Verify each RSS feed and log its status with color."""
-    async with aiohttp.ClientSession() as session:
-        tasks = [verify_rss_feed(url, session) for url in rss_urls]
-        results = await asyncio.gather(*tasks)
+async def verify_rss_feeds(rss_urls, session=None):
+    """Verify each RSS feed and log its status with color. Reuses `session` when given."""
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await verify_rss_feeds(rss_urls, session)
+
+    tasks = [verify_rss_feed(url, session) for url in rss_urls]
+    results = await asyncio.gather(*tasks)
 
     if all("Accessible and Valid" in status for url, status in results):
         print(Fore.GREEN + "All RSS feeds accessible and valid" + Fore.RESET)
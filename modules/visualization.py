@@ -9,8 +9,10 @@ from plotly.subplots import make_subplots
 pio.templates.default = "ggplot2"
 
 
-def visualize_data(stock_symbol, news_data, stock_data):
-    """Creates responsive and fluid visualizations for stock prices and news sentiment."""
+def visualize_data(stock_symbol, news_data, hist, sentiment_series=None):
+    """Creates responsive and fluid visualizations for stock prices and news sentiment.
+    `hist` is the already fetched one-month price history and `sentiment_series`
+    the stored daily sentiment, drawn on the price chart's secondary axis."""
     # Create DataFrame from news_data
     df = pd.DataFrame(news_data)
 
@@ -27,9 +29,6 @@ def visualize_data(stock_symbol, news_data, stock_data):
     avg_sentiment = df["sentiment"].mean()
     print(f"Average Sentiment Score: {avg_sentiment:.2f}")
 
-    # Fetch historical stock data
-    hist = stock_data.history(period="1mo")
-
     # Creating subplots with adjusted row heights
     fig = make_subplots(
         rows=2,
@@ -40,6 +39,7 @@ def visualize_data(stock_symbol, news_data, stock_data):
         ),
         vertical_spacing=0.15,
         row_heights=[0.5, 0.5],
+        specs=[[{"secondary_y": True}], [{}]],
     )
 
     # Adding the stock price line chart
@@ -57,6 +57,28 @@ def visualize_data(stock_symbol, news_data, stock_data):
     )
     fig.update_layout(xaxis_rangeslider_visible=False)
 
+    # Adding the daily sentiment over the same dates as the candlesticks
+    if sentiment_series is not None and not sentiment_series.empty and not hist.empty:
+        # Daily periods are calendar dates, so plot them on the bars' local dates.
+        daily = sentiment_series.copy()
+        daily.index = daily.index.tz_localize(None)
+        first_bar = hist.index[0].tz_localize(None).normalize()
+        daily = daily[daily.index >= first_bar]
+        fig.add_trace(
+            go.Scatter(
+                x=daily.index,
+                y=daily["Sentiment"],
+                mode="lines+markers",
+                name="Daily Sentiment",
+                customdata=daily["Articles"],
+                hovertemplate="Sentiment: %{y:.2f}<br>Articles: %{customdata}<extra></extra>",
+            ),
+            row=1,
+            col=1,
+            secondary_y=True,
+        )
+        fig.update_yaxes(range=[-1, 1], title_text="Sentiment", row=1, col=1, secondary_y=True)
+
     # Shortening titles and sources
     shortened_titles = [
         title[:20] + "..." if len(title) > 20 else title for title in df["title"]
@@ -0,0 +1,19 @@
+import logging
+import sys
+from modules.serving import run_serve
+import warnings
+
+warnings.simplefilter(action="ignore", category=FutureWarning)
+
+logging.basicConfig(
+    filename="stock-model.log",
+    level=logging.INFO,
+    format="%(asctime)s:%(levelname)s:%(message)s",
+)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python serve.py TICKER [TICKER ...]")
+        sys.exit(1)
+    run_serve(sys.argv[1:])
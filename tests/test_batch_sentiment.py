@@ -0,0 +1,64 @@
+import random
+import numpy as np
+import pytest
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from modules.batch_sentiment import VADER, compound_scores
+
+# Words of the special-case idioms, which the batch scorer deliberately skips.
+IDIOM_WORDS = {word for idiom in VADER.SPECIAL_CASE_IDIOMS for word in idiom.split()}
+FILLER = (
+    "stock shares market the company quarter earnings analysts said of kind sort "
+    "at least but very no never without n't not so this is was"
+).split()
+PUNCTUATION = ["", "", "", "!", "!!", "?", "??", ".", ",", "!?"]
+
+
+@pytest.fixture(scope="module")
+def sia():
+    try:
+        return SentimentIntensityAnalyzer()
+    except LookupError:
+        pytest.skip("The NLTK vader_lexicon is not installed")
+
+
+def held_out_texts(lexicon, n_texts=3000, seed=7):
+    """Builds a fixed, seeded set of headline-like texts that mix lexicon words,
+    boosters, negations, "but"/"least", all-caps words and punctuation."""
+    rng = random.Random(seed)
+    sentiment_words = sorted(
+        w for w in lexicon if w.isalpha() and w not in IDIOM_WORDS
+    )
+    boosters = sorted(w for w in VADER.BOOSTER_DICT if w not in IDIOM_WORDS)
+    negations = sorted(VADER.NEGATE)
+    pools = [sentiment_words, boosters, negations, FILLER, FILLER]
+
+    texts = []
+    for _ in range(n_texts):
+        words = []
+        for _ in range(rng.randint(1, 18)):
+            word = rng.choice(rng.choice(pools))
+            if rng.random() < 0.1:
+                word = word.upper()
+            words.append(word + rng.choice(PUNCTUATION))
+        texts.append(" ".join(words))
+    return texts
+
+
+def test_compound_scores_match_nltk(sia):
+    texts = held_out_texts(sia.lexicon)
+
+    expected = np.array([sia.polarity_scores(text)["compound"] for text in texts])
+    actual = compound_scores(texts, sia.lexicon)
+
+    # NLTK rounds intermediate scores to 4 decimals; the batch scorer does not.
+    np.testing.assert_allclose(actual, expected, atol=1e-4, rtol=0)
+
+
+def test_compound_scores_handle_empty_and_non_string_texts(sia):
+    texts = ["", "   ", None, 42, "GREAT results!!!"]
+
+    scores = compound_scores(texts, sia.lexicon)
+
+    assert scores.shape == (5,)
+    expected = [sia.polarity_scores(str(text))["compound"] for text in texts]
+    np.testing.assert_allclose(scores, expected, atol=1e-4, rtol=0)
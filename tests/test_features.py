@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.features import compute_features
+from modules.training import create_features
+
+
+def daily_bars(n_bars=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.002, n_bars)),
+            "High": close * (1 + rng.uniform(0, 0.02, n_bars)),
+            "Low": close * (1 - rng.uniform(0, 0.02, n_bars)),
+            "Close": close,
+            "Volume": rng.integers(1000, 10000, n_bars).astype(float),
+        },
+        index=pd.bdate_range("2022-01-03", periods=n_bars),
+    )
+
+
+@pytest.mark.parametrize(
+    "names, closure",
+    [
+        (["BB_Width"], {"SMA_20", "Std_20", "BB_Upper", "BB_Lower", "BB_Width"}),
+        (["Stoch_D"], {"Lowest_Low_14", "Highest_High_14", "Stoch_K", "Stoch_D"}),
+        (["ATR", "OBV"], {"True_Range", "ATR", "OBV"}),
+        (["Close_Lag_2"], {"Close_Lag_2"}),
+    ],
+)
+def test_only_the_requested_closure_is_computed(names, closure):
+    cache = {}
+
+    features = compute_features(daily_bars(), names, cache)
+
+    assert set(cache) == closure
+    assert list(features.columns) == names
+
+
+def test_indicators_match_direct_computation():
+    bars = daily_bars()
+    names = ["BB_Upper", "BB_Lower", "BB_Width", "ATR", "OBV", "Stoch_K", "Stoch_D"]
+
+    features = compute_features(bars, names)
+
+    high, low, close = bars["High"], bars["Low"], bars["Close"]
+    mid, std = close.rolling(20).mean(), close.rolling(20).std()
+    np.testing.assert_allclose(features["BB_Upper"], mid + 2 * std)
+    np.testing.assert_allclose(features["BB_Lower"], mid - 2 * std)
+    np.testing.assert_allclose(features["BB_Width"], 4 * std / mid)
+
+    true_range = np.maximum(
+        high - low,
+        np.maximum((high - close.shift()).abs(), (low - close.shift()).abs()),
+    )
+    true_range.iloc[0] = high.iloc[0] - low.iloc[0]
+    atr = np.full(len(bars), np.nan)
+    running = true_range.iloc[0]
+    for i in range(1, len(bars)):
+        running += (true_range.iloc[i] - running) / 14  # Wilder smoothing
+        if i >= 13:
+            atr[i] = running
+    np.testing.assert_allclose(features["ATR"], atr)
+
+    obv = [0.0]
+    for i in range(1, len(bars)):
+        step = np.sign(close.iloc[i] - close.iloc[i - 1]) * bars["Volume"].iloc[i]
+        obv.append(obv[-1] + step)
+    np.testing.assert_allclose(features["OBV"], obv)
+
+    lowest, highest = low.rolling(14).min(), high.rolling(14).max()
+    stoch_k = 100 * (close - lowest) / (highest - lowest)
+    np.testing.assert_allclose(features["Stoch_K"], stoch_k)
+    np.testing.assert_allclose(features["Stoch_D"], stoch_k.rolling(3).mean())
+
+
+def test_flat_windows_do_not_produce_infinite_stochastics():
+    bars = daily_bars(60)
+    # High and Low stuck while the close still moves, as in sparse minute bars.
+    bars.iloc[20:40, bars.columns.get_indexer(["High", "Low"])] = 100.0
+
+    features = compute_features(bars, ["Stoch_K", "Stoch_D"])
+    assert not np.isinf(features.to_numpy()).any()
+    assert features["Stoch_K"].iloc[33:40].isna().all()
+
+    training_rows = create_features(bars.copy(), ["Stoch_K", "Stoch_D"])
+    assert np.isfinite(training_rows[["Stoch_K", "Stoch_D"]].to_numpy()).all()
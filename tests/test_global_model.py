@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from modules.global_model import (
+    evaluate_global_model,
+    predict_global,
+    predict_universe,
+    split_ticker,
+    stack_universe,
+)
+
+# Price levels far apart, and uneven history lengths.
+UNIVERSE = {"LOW": (5.0, 40), "MID": (50.0, 73), "HIGH": (500.0, 120)}
+
+
+def synthetic_datasets(seed=0):
+    """Datasets whose target is their first feature, so a model echoing that
+    (scaled) feature predicts every target exactly once unscaled."""
+    rng = np.random.default_rng(seed)
+    datasets = {}
+    for ticker, (price, n_rows) in UNIVERSE.items():
+        X = pd.DataFrame(
+            {
+                "A": price * np.exp(rng.normal(0, 0.05, n_rows)),
+                "B": rng.normal(0, 1, n_rows),
+                "C": rng.normal(100, 10, n_rows),
+            },
+            index=pd.bdate_range("2024-01-01", periods=n_rows),
+        )
+        datasets[ticker] = {
+            "X": X,
+            "y": X["A"].rename("Future_Close"),
+            "latest": X.iloc[[-1]],
+            "last_close": X["A"].iloc[-2],
+        }
+    return datasets
+
+
+class EchoModel:
+    """Stands in for the global model: predicts the first scaled feature and
+    records the ticker ids of every row it scores."""
+
+    def __init__(self):
+        self.ticker_ids = []
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        features, ticker_ids = inputs
+        self.ticker_ids.extend(ticker_ids[:, 0].tolist())
+        return features[:, 0, :]
+
+
+def test_stack_universe_scales_each_ticker_on_its_training_rows():
+    datasets = synthetic_datasets()
+
+    (X_train, ids_train, y_train), (X_test, ids_test, y_test), scalers = stack_universe(
+        datasets
+    )
+
+    assert scalers["tickers"] == list(UNIVERSE)
+    for ticker_id, ticker in enumerate(scalers["tickers"]):
+        X_fit, X_held, _, _ = split_ticker(datasets[ticker])
+        assert (ids_train == ticker_id).sum() == len(X_fit)
+        assert (ids_test == ticker_id).sum() == len(X_held)
+        rows = X_train[ids_train == ticker_id]
+        np.testing.assert_allclose(rows.mean(axis=0), 0, atol=1e-5)
+        np.testing.assert_allclose(rows.std(axis=0), 1, atol=1e-5)
+        np.testing.assert_allclose(
+            y_train[ids_train == ticker_id].mean(), 0, atol=1e-5
+        )
+        np.testing.assert_allclose(scalers["y_mean"][ticker_id], X_fit["A"].mean())
+
+
+def test_target_scaling_round_trips_through_predict_global():
+    datasets = synthetic_datasets()
+    _, _, scalers = stack_universe(datasets)
+    # Interleave the tickers to catch rows paired with another ticker's scalers.
+    rows = [(t, i) for i in range(40) for t in ("HIGH", "LOW", "MID")]
+    tickers = [t for t, _ in rows]
+    features = pd.concat([datasets[t]["X"].iloc[[i]] for t, i in rows])
+
+    predicted = predict_global(EchoModel(), scalers, tickers, features)
+
+    np.testing.assert_allclose(predicted, features["A"], rtol=1e-5)
+    forecast = predict_universe(EchoModel(), scalers, datasets)
+    np.testing.assert_allclose(
+        forecast["Forecast"],
+        [datasets[t]["latest"]["A"].iloc[0] for t in forecast.index],
+        rtol=1e-5,
+    )
+
+
+def test_every_test_row_is_scored_exactly_once():
+    datasets = synthetic_datasets()
+    _, _, scalers = stack_universe(datasets)
+    model = EchoModel()
+
+    errors = evaluate_global_model(model, scalers, datasets)
+
+    assert list(errors.index) == list(UNIVERSE)
+    counts = pd.Series(model.ticker_ids).value_counts()
+    for ticker_id, ticker in enumerate(scalers["tickers"]):
+        assert counts[ticker_id] == len(split_ticker(datasets[ticker])[1])
+    # Predictions line up with their own targets: the echoed feature is the target.
+    np.testing.assert_allclose(errors, 0, atol=1e-3)
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from modules.inference import load_inference_artifact, predict_prices
+from modules.training import build_model, export_inference_artifact
+
+CONFIG = {"optimizer": "adam", "loss": "mse"}
+FEATURES = ["A", "B", "C", "D", "E"]
+
+
+@pytest.mark.parametrize("randomize", [False, True])
+def test_lstm_forward_matches_keras(tmp_path, randomize):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(5, 2, (64, len(FEATURES))), columns=FEATURES)
+    scaler = StandardScaler().fit(frame)
+    model = build_model(len(FEATURES), CONFIG)
+    if randomize:
+        # Non-zero biases and larger weights make a wrong gate order show up.
+        model.set_weights(
+            [rng.normal(0, 0.3, w.shape).astype(w.dtype) for w in model.get_weights()]
+        )
+    path = str(tmp_path / "model.npz")
+    export_inference_artifact(model, scaler, FEATURES, path)
+
+    actual = predict_prices(load_inference_artifact(path), frame)
+
+    scaled = scaler.transform(frame).reshape((-1, len(FEATURES), 1))
+    expected = model.predict(scaled, verbose=0)[:, 0]
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_serving_imports_neither_keras_nor_calcs():
+    code = (
+        "import sys, modules.serving; "
+        "print(sorted(m for m in ('keras', 'tensorflow', 'modules.calcs') if m in sys.modules))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,225 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import urllib.parse
+import pandas as pd
+import pytest
+from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+from modules import ingestion
+from modules.ingestion import (
+    DEFAULT_INGESTION_SETTINGS,
+    download_universe,
+    http_fetch_batch,
+)
+
+SETTINGS = dict(
+    DEFAULT_INGESTION_SETTINGS,
+    batch_size=2,
+    max_retries=2,
+    backoff_base=0.01,
+    requests_per_second=100.0,
+    timeout=5,
+)
+KNOWN = {"AAA": 10.0, "BBB": 20.0, "CCC": 30.0}
+
+
+def price_csv(symbols, start, end):
+    rows = ["Date,Ticker,Open,High,Low,Close,Volume"]
+    for date in pd.bdate_range(start, end, inclusive="left"):
+        for symbol in symbols:
+            if symbol in KNOWN:
+                price = KNOWN[symbol]
+                rows.append(
+                    f"{date.date()},{symbol},{price},{price + 1},{price - 1},{price},1000"
+                )
+    return "\n".join(rows) + "\n"
+
+
+@pytest.fixture
+def server():
+    """A local stand-in price server. It answers 500 while `fail` is set and
+    counts the requests it receives."""
+    state = {"fail": False, "requests": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            if state["fail"]:
+                self.send_error(500)
+                return
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            body = price_csv(
+                query["symbols"][0].split(","), query["start"][0], query["end"][0]
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_address[1]}/prices"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_universe_from_stand_in_server(server):
+    frames, ledger = download_universe(
+        ["aaa", "BBB", "CCC", "ZZZ"],
+        "2024-01-01",
+        "2024-01-13",
+        fetch_batch=http_fetch_batch(server["url"]),
+        settings=SETTINGS,
+    )
+
+    assert server["requests"] == 2
+    assert sorted(frames) == ["AAA", "BBB", "CCC"]
+    assert len(frames["AAA"]) == 10
+    assert list(frames["BBB"].columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert (frames["CCC"]["Close"] == 30.0).all()
+    assert ledger["AAA"] == {"status": "ok", "attempts": 1, "rows": 10, "error": None}
+    assert ledger["ZZZ"]["status"] == "empty"
+
+
+def test_failing_server_is_retried_and_marked_failed(server):
+    server["fail"] = True
+    frames, ledger = download_universe(
+        ["AAA", "BBB"],
+        "2024-01-01",
+        "2024-01-13",
+        fetch_batch=http_fetch_batch(server["url"]),
+        settings=SETTINGS,
+    )
+
+    assert frames == {}
+    assert server["requests"] == SETTINGS["max_retries"] + 1
+    for symbol in ("AAA", "BBB"):
+        assert ledger[symbol]["status"] == "failed"
+        assert ledger[symbol]["attempts"] == SETTINGS["max_retries"] + 1
+        assert "500" in ledger[symbol]["error"]
+
+
+class StubTicker:
+    """Stands in for yf.Ticker: `behaviour` maps a symbol to a frame or an
+    exception to raise from `history`, or to a list of them, one per call.
+    `calls` counts the `history` requests per symbol."""
+
+    behaviour = {}
+    calls = {}
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, **kwargs):
+        n_calls = self.calls.get(self.symbol, 0)
+        self.calls[self.symbol] = n_calls + 1
+        result = self.behaviour[self.symbol]
+        if isinstance(result, list):
+            result = result[min(n_calls, len(result) - 1)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def stub_yahoo(monkeypatch):
+    """Routes Yahoo requests to StubTicker and counts the rate-limit tokens taken."""
+    StubTicker.calls = {}
+    tokens = []
+
+    class CountingBucket(ingestion.TokenBucket):
+        def acquire(self):
+            tokens.append(1)
+            super().acquire()
+
+    monkeypatch.setattr(ingestion.yf, "Ticker", StubTicker)
+    monkeypatch.setattr(ingestion, "TokenBucket", CountingBucket)
+    return tokens
+
+
+def yahoo_frame():
+    index = pd.date_range("2024-01-02", periods=3, tz="America/New_York", name="Date")
+    return pd.DataFrame(
+        {
+            "Open": 1.0,
+            "High": 2.0,
+            "Low": 0.5,
+            "Close": 1.5,
+            "Volume": 100,
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=index,
+    )
+
+
+def test_yahoo_network_errors_fail_the_batch(stub_yahoo):
+    StubTicker.behaviour = {"AAA": ConnectionError("Could not resolve host")}
+
+    frames, ledger = download_universe(
+        ["AAA"], "2024-01-01", "2024-01-13", settings=SETTINGS
+    )
+
+    assert frames == {}
+    assert ledger["AAA"]["status"] == "failed"
+    assert ledger["AAA"]["attempts"] == SETTINGS["max_retries"] + 1
+    assert "Could not resolve host" in ledger["AAA"]["error"]
+
+
+def test_yahoo_missing_tickers_are_empty(stub_yahoo):
+    StubTicker.behaviour = {
+        "AAA": yahoo_frame(),
+        "ZZZ": YFPricesMissingError("ZZZ", ""),
+    }
+
+    frames, ledger = download_universe(
+        ["AAA", "ZZZ"], "2024-01-01", "2024-01-13", settings=SETTINGS
+    )
+
+    assert ledger["AAA"] == {"status": "ok", "attempts": 1, "rows": 3, "error": None}
+    assert ledger["ZZZ"]["status"] == "empty"
+    assert frames["AAA"].index.tz is None
+    assert list(frames["AAA"].columns) == ["Open", "High", "Low", "Close", "Volume"]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        # Raised for every ticker once yfinance stops falling back to `.info`.
+        YFTzMissingError("AAA"),
+        YFPricesMissingError("AAA", "(1d 2024-01-01 -> 2024-01-13)(Yahoo status_code = 503)"),
+    ],
+)
+def test_yahoo_outage_errors_are_retried_and_failed(stub_yahoo, error):
+    StubTicker.behaviour = {"AAA": error}
+
+    frames, ledger = download_universe(
+        ["AAA"], "2024-01-01", "2024-01-13", settings=SETTINGS
+    )
+
+    assert frames == {}
+    assert ledger["AAA"]["status"] == "failed"
+    assert ledger["AAA"]["attempts"] == SETTINGS["max_retries"] + 1
+    assert StubTicker.calls["AAA"] == SETTINGS["max_retries"] + 1
+
+
+def test_only_failed_tickers_are_retried_one_token_per_request(stub_yahoo):
+    StubTicker.behaviour = {
+        "AAA": yahoo_frame(),
+        "BBB": [ConnectionError("429 Too Many Requests"), yahoo_frame()],
+    }
+
+    frames, ledger = download_universe(
+        ["AAA", "BBB"], "2024-01-01", "2024-01-13", settings=SETTINGS
+    )
+
+    assert sorted(frames) == ["AAA", "BBB"]
+    assert StubTicker.calls == {"AAA": 1, "BBB": 2}
+    assert len(stub_yahoo) == 3
+    assert ledger["AAA"] == {"status": "ok", "attempts": 1, "rows": 3, "error": None}
+    assert ledger["BBB"] == {"status": "ok", "attempts": 2, "rows": 3, "error": None}
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.intraday import (
+    BAR_COLUMNS,
+    fit_streaming_scaler,
+    iter_feature_chunks,
+    iter_training_batches,
+    read_minute_bars,
+)
+from modules.training import SELECTED_FEATURES, create_features
+
+
+def minute_bars(n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.0005, n_bars)),
+            "High": close * 1.001,
+            "Low": close * 0.999,
+            "Close": close,
+            "Volume": rng.integers(100, 1000, n_bars),
+        },
+        index=pd.date_range("2024-01-02 09:30", periods=n_bars, freq="min"),
+    ).astype(np.float32)
+
+
+@pytest.mark.parametrize("chunk_size", [137, 199, 500, 1500])
+def test_chunked_features_match_full_history(chunk_size):
+    bars = minute_bars(1500)
+    expected = create_features(bars.copy(), SELECTED_FEATURES)
+
+    def chunk_source():
+        for start in range(0, len(bars), chunk_size):
+            yield bars.iloc[start : start + chunk_size][BAR_COLUMNS]
+
+    chunked = pd.concat(iter_feature_chunks(chunk_source))
+
+    assert len(chunked) == len(expected) == 1300
+    assert chunked.index.equals(expected.index)
+    columns = SELECTED_FEATURES + ["Future_Close"]
+    np.testing.assert_allclose(
+        chunked[columns].to_numpy(dtype=np.float64),
+        expected[columns].to_numpy(dtype=np.float64),
+        rtol=1e-4,
+        atol=1e-4,
+    )
+
+
+@pytest.mark.parametrize("index_name", ["timestamp", "Datetime", "date"])
+def test_read_minute_bars_keeps_the_timestamp_column(tmp_path, index_name):
+    bars = minute_bars(250)
+    bars.insert(2, "Trades", 1)
+    path = tmp_path / "bars.csv"
+    bars.rename_axis(index_name).to_csv(path)
+
+    chunks = list(read_minute_bars(path, 100))
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    frame = pd.concat(chunks)
+    assert list(frame.columns) == BAR_COLUMNS
+    assert (frame.dtypes == np.float32).all()
+    assert frame.index.equals(bars.index.rename(index_name))
+
+
+def test_training_batches_stream_the_cached_feature_rows(tmp_path):
+    bars = minute_bars(1500)
+    expected = create_features(bars.copy(), SELECTED_FEATURES)
+
+    def chunk_source():
+        for start in range(0, len(bars), 199):
+            yield bars.iloc[start : start + 199][BAR_COLUMNS]
+
+    rows_path = str(tmp_path / "rows.f32")
+    state = {}
+    scaler, n_rows = fit_streaming_scaler(chunk_source, SELECTED_FEATURES, rows_path, state)
+    assert n_rows == len(expected)
+    assert state["tail"].index[-1] == bars.index[-1]
+
+    batches = list(
+        iter_training_batches(
+            rows_path, len(SELECTED_FEATURES), scaler, 32, 1000, n_rows, 137
+        )
+    )
+
+    assert max(len(X) for X, _ in batches) == 32
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+    holdout = expected.iloc[1000:]
+    np.testing.assert_allclose(
+        X[:, :, 0],
+        scaler.transform(holdout[SELECTED_FEATURES].to_numpy(dtype=np.float32)),
+        rtol=1e-4,
+        atol=1e-4,
+    )
+    np.testing.assert_allclose(
+        y[:, 0], holdout["Future_Close"].to_numpy(dtype=np.float32), rtol=1e-5
+    )
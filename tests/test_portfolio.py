@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from modules.portfolio import (
+    TRADING_DAYS,
+    build_returns_matrix,
+    efficient_frontier,
+    shrinkage_covariance,
+)
+
+
+def random_closes(n_days=500, n_tickers=40, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.015, (n_days, n_tickers))
+    return pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=pd.bdate_range("2022-01-03", periods=n_days),
+        columns=[f"T{i:02d}" for i in range(n_tickers)],
+    )
+
+
+def test_gaps_do_not_truncate_the_returns_matrix():
+    closes = random_closes()
+    rng = np.random.default_rng(1)
+    holes = closes.mask(rng.random(closes.shape) < 0.02)
+    holes.iloc[: len(closes) // 20, 0] = np.nan  # a late listing
+    holes["SPARSE"] = closes["T01"].where(rng.random(len(closes)) < 0.5)
+
+    returns = build_returns_matrix(holes)
+
+    assert "SPARSE" not in returns.columns
+    assert len(returns) == len(closes) - 1
+    assert not returns.isna().any(axis=None)
+    # A move across a gap lands on the next quote, so the total return is kept.
+    kept = holes[returns.columns]
+    np.testing.assert_allclose(
+        (1 + returns).prod(), kept.ffill().iloc[-1] / kept.bfill().iloc[0], rtol=1e-10
+    )
+
+
+def test_efficient_frontier_hits_targets():
+    returns = build_returns_matrix(random_closes())
+    covariance, _ = shrinkage_covariance(returns)
+    targets = np.array([0.05, 0.1, 0.2, 0.3])
+
+    frontier = efficient_frontier(returns, target_returns=targets, covariance=covariance)
+
+    weights = frontier["weights"].to_numpy()
+    mu = returns.mean().to_numpy() * TRADING_DAYS
+    sigma = covariance.to_numpy() * TRADING_DAYS
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    np.testing.assert_allclose(weights @ mu, targets)
+    np.testing.assert_allclose(
+        frontier["volatilities"], np.sqrt(np.einsum("ti,ij,tj->t", weights, sigma, weights))
+    )
+    assert np.isclose(frontier["min_variance_weights"].sum(), 1)
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import scheduler
+from modules.intraday import create_intraday_features
+from modules.scheduler import (
+    DEFAULT_SCHEDULER_SETTINGS,
+    claim_job,
+    connect,
+    defer_job,
+    enqueue,
+    finish_job,
+    ingest_job,
+    open_queue,
+    read_csv,
+    retrain_job,
+    ticker_paths,
+    update_job,
+)
+from modules.training import SELECTED_FEATURES
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    open_queue(path)
+    return path
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        scheduler, "read_config", lambda: {"artifact_dir": str(tmp_path / "models")}
+    )
+    return dict(
+        DEFAULT_SCHEDULER_SETTINGS, watchlist=["AAA"], state_dir=str(tmp_path / "data")
+    )
+
+
+def job_rows(db_path):
+    with connect(db_path) as conn:
+        return [dict(row) for row in conn.execute("SELECT * FROM jobs ORDER BY id")]
+
+
+def daily_bars(n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.002, n_bars)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1000, 10000, n_bars).astype(float),
+        },
+        index=pd.bdate_range("2020-01-01", periods=n_bars, name="Date"),
+    )
+
+
+def test_enqueue_ignores_duplicate_active_jobs(db_path):
+    assert enqueue(db_path, "update", "AAA")
+    assert not enqueue(db_path, "update", "AAA")
+    assert enqueue(db_path, "retrain", "AAA")
+    assert enqueue(db_path, "update", "BBB")
+
+    job = claim_job(db_path)
+    assert not enqueue(db_path, "update", "AAA")  # still running
+    finish_job(db_path, job)
+    assert enqueue(db_path, "update", "AAA")  # done jobs do not block
+
+
+def test_open_queue_requeues_running_jobs(db_path):
+    enqueue(db_path, "update", "AAA")
+    claim_job(db_path)
+    assert job_rows(db_path)[0]["status"] == "running"
+
+    open_queue(db_path)  # as after a crash
+
+    assert job_rows(db_path)[0]["status"] == "pending"
+    job = claim_job(db_path)
+    assert (job["kind"], job["ticker"], job["attempts"]) == ("update", "AAA", 1)
+
+
+def test_failed_jobs_retry_until_max_attempts(db_path):
+    enqueue(db_path, "update", "AAA")
+
+    finish_job(db_path, claim_job(db_path), "boom", max_attempts=2)
+    assert job_rows(db_path)[0]["status"] == "pending"
+    finish_job(db_path, claim_job(db_path), "boom", max_attempts=2)
+
+    row = job_rows(db_path)[0]
+    assert (row["status"], row["attempts"], row["error"]) == ("failed", 2, "boom")
+    assert claim_job(db_path) is None
+
+
+def test_deferred_jobs_do_not_use_up_attempts(db_path):
+    enqueue(db_path, "retrain", "AAA")
+
+    for _ in range(5):
+        defer_job(db_path, claim_job(db_path))
+
+    row = job_rows(db_path)[0]
+    assert (row["status"], row["attempts"]) == ("pending", 0)
+    assert claim_job(db_path, skip_kinds=("retrain",)) is None
+
+
+def test_incremental_updates_match_a_full_recompute(settings, db_path, monkeypatch):
+    bars = daily_bars(400)
+    available = {}
+
+    def download(symbols, start_date, end_date):
+        frame = available["bars"]
+        frame = frame[(frame.index >= start_date) & (frame.index < end_date)]
+        return {"AAA": frame}, {"AAA": {"status": "ok", "error": None}}
+
+    monkeypatch.setattr(scheduler, "download_universe", download)
+    for n_bars in (250, 251, 330, 400):
+        available["bars"] = bars.iloc[:n_bars]
+        ingest_job(settings, db_path, "*")
+        update_job(settings, db_path, "AAA")
+
+    features = read_csv(ticker_paths(settings, "AAA")["features"])
+    expected = create_intraday_features(bars, {}, SELECTED_FEATURES)
+    assert features.index.equals(expected.index)
+    columns = SELECTED_FEATURES + ["Future_Close"]
+    np.testing.assert_allclose(
+        features[columns].to_numpy(dtype=np.float64),
+        expected[columns].to_numpy(dtype=np.float64),
+        rtol=1e-4,
+        atol=1e-4,
+    )
+    # Every ingest and update asked for these; each is queued once. No model
+    # exists yet, so the update asks for a retrain.
+    assert [(r["kind"], r["ticker"]) for r in job_rows(db_path)] == [
+        ("update", "AAA"),
+        ("retrain", "AAA"),
+    ]
+
+
+def test_retrain_baseline_is_measured_on_unseen_rows(settings, db_path, monkeypatch):
+    features = create_intraday_features(daily_bars(600), {}, SELECTED_FEATURES)
+    path = ticker_paths(settings, "AAA")["features"]
+    scheduler.append_csv(path, features)
+    trained, saved = [], []
+    monkeypatch.setattr(
+        scheduler,
+        "train_model",
+        lambda X, y, **kwargs: trained.append(X) or ("model", "scaler"),
+    )
+    monkeypatch.setattr(
+        scheduler,
+        "save_model_and_baseline",
+        lambda paths, ticker, model, scaler, holdout=None: saved.append(holdout),
+    )
+
+    retrain_job(settings, db_path, "AAA")
+
+    window = settings["baseline_window"]
+    assert len(saved[0]) == window
+    assert trained[0].index[-1] < saved[0].index[0]
+    assert len(trained[0]) + window == len(features)
@@ -0,0 +1,43 @@
+import pytest
+from feedparser import FeedParserDict
+from modules import sentiment
+from modules.sentiment import filter_relevant_articles
+
+
+def entry(title, link):
+    return FeedParserDict(title=title, link=link, summary="")
+
+
+@pytest.fixture(autouse=True)
+def nltk_data():
+    try:
+        sentiment.calculate_relevance_score("Apple", "AAPL", "Apple Inc.", 0.0)
+    except LookupError:
+        pytest.skip("The NLTK tokenizer or stopwords data is not installed")
+
+
+def test_stored_entries_are_kept_without_scoring(monkeypatch):
+    entries = [
+        entry("Apple beats estimates", "https://news/1"),
+        entry("Apple shares fall", "https://news/2"),
+        entry("Weather turns cold", "https://news/3"),
+    ]
+    scored = []
+    score = sentiment.calculate_relevance_score
+
+    def counting_score(text, *args, **kwargs):
+        scored.append(text)
+        return score(text, *args, **kwargs)
+
+    monkeypatch.setattr(sentiment, "calculate_relevance_score", counting_score)
+
+    articles = filter_relevant_articles(
+        entries, "AAPL", "Apple Inc.", {"https://news/2": 0.1}
+    )
+
+    assert [text.strip() for text in scored] == [
+        "Apple beats estimates",
+        "Weather turns cold",
+    ]
+    assert [article[1] for article in articles] == ["https://news/1", "https://news/2"]
+    assert articles[1][2] is None
@@ -0,0 +1,82 @@
+import glob
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from modules.sentiment_store import (
+    COMPACT_AFTER_PARTS,
+    load_articles,
+    load_sentiment_series,
+    store_articles,
+    stored_sentiments,
+)
+
+
+def refreshes(n_refreshes, per_refresh=3, seed=0):
+    """Batches of articles as successive refreshes would store them; each batch
+    repeats one article of the previous batch."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    batches, article_id = [], 0
+    for _ in range(n_refreshes):
+        batch = [batches[-1][-1]] if batches else []
+        for _ in range(per_refresh):
+            batch.append(
+                {
+                    "title": f"Article {article_id}",
+                    "source": f"https://news/{article_id}",
+                    "sentiment": float(rng.uniform(-1, 1)),
+                    "published": start + pd.Timedelta(hours=int(rng.integers(0, 24 * 40))),
+                }
+            )
+            article_id += 1
+        batches.append(batch)
+    return batches
+
+
+def expected_series(articles, freq):
+    frame = pd.DataFrame(articles).drop_duplicates("source")
+    groups = frame.groupby(frame["published"].dt.floor(freq))["sentiment"]
+    return groups.mean(), groups.count()
+
+
+def test_parts_are_compacted_without_changing_reads(tmp_path):
+    batches = refreshes(3 * COMPACT_AFTER_PARTS + 5)
+    for batch in batches:
+        store_articles("AAA", batch, str(tmp_path))
+
+    articles = [article for batch in batches for article in batch]
+    for directory in ("articles", "D", "h"):
+        files = glob.glob(os.path.join(tmp_path, "AAA", directory, "*.parquet"))
+        assert len(files) <= COMPACT_AFTER_PARTS
+
+    stored = load_articles("AAA", str(tmp_path))
+    assert len(stored) == stored["link"].nunique() == 3 * len(batches)
+    assert stored_sentiments("AAA", str(tmp_path)) == {
+        a["source"]: a["sentiment"] for a in articles
+    }
+    for freq in ("D", "h"):
+        series = load_sentiment_series("AAA", freq, str(tmp_path))
+        mean, count = expected_series(articles, freq)
+        np.testing.assert_allclose(series["Sentiment"], mean)
+        np.testing.assert_array_equal(series["Articles"], count)
+
+
+def test_parts_left_by_an_interrupted_compaction_are_ignored(tmp_path):
+    batches = refreshes(COMPACT_AFTER_PARTS)
+    for batch in batches[:-1]:
+        store_articles("AAA", batch, str(tmp_path))
+    daily = os.path.join(tmp_path, "AAA", "D")
+    saved = str(tmp_path / "saved")
+    shutil.copytree(daily, saved)
+
+    store_articles("AAA", batches[-1], str(tmp_path))  # compacts
+    assert glob.glob(os.path.join(daily, "base-*.parquet"))
+    # As if the process died after writing the base, before removing the parts.
+    for path in glob.glob(os.path.join(saved, "*.parquet")):
+        shutil.copy(path, daily)
+
+    series = load_sentiment_series("AAA", "D", str(tmp_path))
+    mean, count = expected_series([a for batch in batches for a in batch], "D")
+    np.testing.assert_array_equal(series["Articles"], count)
+    np.testing.assert_allclose(series["Sentiment"], mean)
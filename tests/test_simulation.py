@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.stats import norm
+from modules.simulation import risk_report, simulate_paths
+
+
+def daily_returns(n_days=1000, seed=0):
+    return np.random.default_rng(seed).normal(0.0005, 0.012, n_days)
+
+
+def test_same_seed_gives_the_same_paths_with_any_worker_count():
+    returns = daily_returns()
+    for method in ("gbm", "bootstrap"):
+        kwargs = dict(method=method, chunk_size=5000, seed=42)
+
+        horizons, serial = simulate_paths(returns, 20000, [1, 5, 21], workers=1, **kwargs)
+        _, parallel = simulate_paths(returns, 20000, [1, 5, 21], workers=3, **kwargs)
+
+        assert horizons == [1, 5, 21]
+        assert serial.shape == (20000, 3)
+        np.testing.assert_array_equal(serial, parallel)
+
+
+def test_gbm_risk_report_matches_the_lognormal_closed_form():
+    returns = daily_returns()
+    horizons, gross = simulate_paths(
+        returns, 200000, [1, 21], method="gbm", chunk_size=50000, workers=1, seed=7
+    )
+    confidence = 0.95
+
+    report = risk_report(gross, horizons, 100.0, confidence)
+
+    log_returns = np.log1p(returns)
+    for horizon in horizons:
+        mean = horizon * log_returns.mean()
+        std = np.sqrt(horizon) * log_returns.std(ddof=1)
+        cutoff = mean + std * norm.ppf(1 - confidence)
+        var = 1 - np.exp(cutoff)
+        # E[exp(X) | X <= cutoff] for X ~ N(mean, std^2).
+        tail_mean = (
+            np.exp(mean + std**2 / 2)
+            * norm.cdf((cutoff - mean - std**2) / std)
+            / (1 - confidence)
+        )
+        cvar = 1 - tail_mean
+        row = report.loc[horizon]
+        np.testing.assert_allclose(row["VaR"], var, rtol=0.02)
+        np.testing.assert_allclose(row["CVaR"], cvar, rtol=0.02)
+        np.testing.assert_allclose(row["P50"], 100 * np.exp(mean), rtol=0.002)
@@ -0,0 +1,91 @@
+import os
+import time
+import numpy as np
+import pytest
+from modules import training
+from modules.training import (
+    ResumableEarlyStopping,
+    build_model,
+    checkpoint_path,
+    fit_with_budget,
+    load_checkpoint,
+)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    config = {
+        "optimizer": "adam",
+        "loss": "mse",
+        "batch_size": 32,
+        "epochs": 3,
+        "early_stopping": {
+            "monitor": "val_loss",
+            "patience": 50,
+            "restore_best_weights": True,
+        },
+        "training_budget": {
+            "ticker_seconds": None,
+            "job_seconds": None,
+            "checkpoint_dir": str(tmp_path),
+            "checkpoint_interval": 1,
+        },
+    }
+    monkeypatch.setattr(training, "read_config", lambda: config)
+    return config
+
+
+def dataset(n_rows=256, n_features=4, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features, 1)).astype(np.float32)
+    y = X.sum(axis=(1, 2)).astype(np.float32)
+    return X, y
+
+
+def test_budget_stop_checkpoints_and_resumes(config):
+    X, y = dataset()
+    signature = {"rows": len(X)}
+    path = checkpoint_path("T")
+
+    model = build_model(4, config)
+    stopped = fit_with_budget(
+        model, X, y, (X, y), 32, "T", time.monotonic(), signature
+    )
+    assert stopped
+    assert os.path.isfile(path)
+
+    resumed_model = build_model(4, config)
+    state = load_checkpoint(path, resumed_model, signature)
+    assert state["epoch"] == 1
+    assert state["best_epoch"] == 0
+    for saved, restored in zip(model.get_weights(), resumed_model.get_weights()):
+        np.testing.assert_array_equal(saved, restored)
+
+    # The same run on other data must not pick the checkpoint up.
+    assert load_checkpoint(path, build_model(4, config), {"rows": len(X) + 1}) is None
+
+    stopped = fit_with_budget(
+        resumed_model, X, y, (X, y), 32, "T", None, signature
+    )
+    assert not stopped
+    assert not os.path.isfile(path)
+
+
+def test_early_stopping_state_survives_resume(config):
+    model = build_model(4, config)
+    early_stopping = ResumableEarlyStopping(
+        {"epoch": 10, "best": 0.5, "best_epoch": 2},
+        monitor="val_loss",
+        patience=5,
+        restore_best_weights=True,
+    )
+    early_stopping.set_model(model)
+    early_stopping.on_train_begin()
+
+    assert early_stopping.wait == 7
+    assert early_stopping.best == 0.5
+    assert early_stopping.best_epoch == 2
+
+    # No improvement on the first resumed epoch: patience was already spent.
+    early_stopping.on_epoch_end(10, {"val_loss": 0.6})
+    assert model.stop_training